@@ -1,7 +1,7 @@
 {
     "name": "Publicidad Suscripciones",
     "summary": "Gestión de suscripciones de pautas publicitarias con pago de contado.",
-    "version": "18.0.1.0.0",
+    "version": "18.0.1.1.0",
     "author": "Antigravity",
     "website": "https://example.com",
     "license": "LGPL-3",
@@ -17,8 +17,19 @@
         "security/security_groups.xml",
         "security/ir.model.access.csv",
         "views/publicidad_suscripcion_views.xml",
+        "wizard/publicidad_campana_wizard_views.xml",
         "views/contrato_marco_views.xml",
+        "views/publicidad_tarifa_centro_views.xml",
+        "views/publicidad_perf_log_views.xml",
+        "views/product_attribute_views.xml",
+        "wizard/publicidad_import_wizard_views.xml",
+        "report/publicidad_ocupacion_report_views.xml",
+        "views/publicidad_cuota_views.xml",
         "data/publicidad_tax_data.xml",
+        "data/ir_cron_data.xml",
+        "data/publicidad_tarifa_centro_data.xml",
     ],
+    "pre_init_hook": "pre_init_hook",
+    "post_init_hook": "post_init_hook",
     "application": True,
 }
\ No newline at end of file
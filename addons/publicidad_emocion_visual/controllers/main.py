@@ -0,0 +1,136 @@
+import csv
+import io
+
+from odoo import fields, http, _
+from odoo.http import content_disposition, request
+
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+
+class PublicidadController(http.Controller):
+    @http.route("/publicidad/disponibilidad", type="json", auth="user")
+    def disponibilidad(
+        self,
+        date_from,
+        date_to,
+        centro_comercial=None,
+        ubicacion_macro=None,
+        formato_id=None,
+    ):
+        """Disponibilidad de activos por ventana de fechas"""
+        return request.env["publicidad.suscripcion"].get_availability(
+            date_from,
+            date_to,
+            centro_comercial=centro_comercial,
+            ubicacion_macro=ubicacion_macro,
+            formato_id=formato_id,
+        )
+
+    @http.route("/publicidad/timeline", type="json", auth="user")
+    def timeline(
+        self,
+        date_from,
+        date_to,
+        centro_comercial=None,
+        offset=0,
+        limit=None,
+        loaded_from=None,
+        loaded_to=None,
+    ):
+        """Reservas por activo de la ventana visible del timeline"""
+        kwargs = {"limit": limit} if limit else {}
+        return request.env["publicidad.suscripcion"].get_timeline(
+            date_from,
+            date_to,
+            centro_comercial=centro_comercial,
+            offset=offset,
+            loaded_from=loaded_from,
+            loaded_to=loaded_to,
+            **kwargs,
+        )
+
+    @http.route("/publicidad/cartera", type="json", auth="user")
+    def cartera(self, date_ref=None):
+        """Cartera por cliente en tramos de vencimiento"""
+        return request.env["publicidad.cuota"].get_aging(date_ref)
+
+    @http.route("/publicidad/tarifario", type="http", auth="user")
+    def tarifario(self, file_format="xlsx", centro_comercial=None, fecha=None):
+        """Tarifario completo del catálogo en XLSX o CSV"""
+        Suscripcion = request.env["publicidad.suscripcion"]
+        Suscripcion.check_access("read")
+        products = request.env["product.product"].search(
+            Suscripcion._get_asset_domain(centro_comercial), order="default_code, id"
+        )
+        rows = Suscripcion._iter_rate_card(products, fields.Date.to_date(fecha))
+        labels = {
+            name: dict(Suscripcion._fields[name]._description_selection(request.env))
+            for name in (
+                "centro_comercial",
+                "ubicacion_macro",
+                "tipo_contenido",
+                "duracion_meses",
+            )
+        }
+        header = [
+            _("Referencia"),
+            _("Activo"),
+            _("Centro Comercial"),
+            _("Ubicación Macro"),
+            _("Tipo de Contenido"),
+            _("Duración"),
+            _("Precio Mensual"),
+            _("Valor Total"),
+        ]
+
+        def lines():
+            for product, centro, ubicacion, contenido, duracion, precio, total in rows:
+                yield [
+                    product.default_code or "",
+                    product.name,
+                    labels["centro_comercial"][centro],
+                    labels["ubicacion_macro"][ubicacion],
+                    labels["tipo_contenido"][contenido],
+                    labels["duracion_meses"][duracion],
+                    precio,
+                    total,
+                ]
+
+        # Las filas se escriben a medida que se calculan: el cursor de la
+        # petición se cierra al responder, así que no se difiere la iteración
+        if file_format == "csv" or xlsxwriter is None:
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(header)
+            writer.writerows(lines())
+            return request.make_response(
+                output.getvalue().encode(),
+                headers=[
+                    ("Content-Type", "text/csv; charset=utf-8"),
+                    ("Content-Disposition", content_disposition("tarifario.csv")),
+                ],
+            )
+
+        output = io.BytesIO()
+        workbook = xlsxwriter.Workbook(output, {"constant_memory": True})
+        sheet = workbook.add_worksheet(_("Tarifario"))
+        bold = workbook.add_format({"bold": True})
+        money = workbook.add_format({"num_format": "#,##0.00"})
+        sheet.write_row(0, 0, header, bold)
+        for row_number, line in enumerate(lines(), start=1):
+            sheet.write_row(row_number, 0, line[:6])
+            sheet.write_row(row_number, 6, line[6:], money)
+        workbook.close()
+        return request.make_response(
+            output.getvalue(),
+            headers=[
+                (
+                    "Content-Type",
+                    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                ),
+                ("Content-Disposition", content_disposition("tarifario.xlsx")),
+            ],
+        )
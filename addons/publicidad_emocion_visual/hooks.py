@@ -0,0 +1,27 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def _enable_btree_gist(cr):
+    """Habilita btree_gist para la restricción de exclusión de agenda"""
+    try:
+        with cr.savepoint():
+            cr.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    except Exception:
+        # Sin permisos: la validación Python sigue protegiendo la agenda
+        _logger.warning(
+            "No se pudo habilitar btree_gist; la restricción agenda_no_overlap "
+            "no será creada."
+        )
+
+
+def pre_init_hook(env):
+    """Prepara extensiones de PostgreSQL antes de crear las tablas"""
+    _enable_btree_gist(env.cr)
+
+
+def post_init_hook(env):
+    """Sincroniza el catálogo existente y carga el reporte de ocupación"""
+    env["product.template"]._sync_publicidad_catalog()
+    env["publicidad.ocupacion.report"]._refresh()
@@ -0,0 +1,10 @@
+from odoo import SUPERUSER_ID, api
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    # Campos de activo desde los atributos clasificados (antes del reporte,
+    # que agrupa por centro y ubicación de la plantilla)
+    env["product.template"]._sync_publicidad_catalog()
+    # Carga inicial del reporte materializado (init() lo crea vacío)
+    env["publicidad.ocupacion.report"]._refresh()
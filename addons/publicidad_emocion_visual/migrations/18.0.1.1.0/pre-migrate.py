@@ -0,0 +1,6 @@
+from odoo.addons.publicidad_emocion_visual.hooks import _enable_btree_gist
+
+
+def migrate(cr, version):
+    # pre_init_hook solo corre en instalaciones nuevas
+    _enable_btree_gist(cr)
@@ -2,4 +2,11 @@ from . import publicidad_suscripcion
 from . import product_template
 from . import account_move
 from . import contrato_marco
-
+from . import product_product
+from . import product_attribute
+from . import publicidad_tarifa_centro
+from . import account_move_line
+from . import publicidad_perf_log
+from . import publicidad_notificacion
+from . import publicidad_cuota
+from . import publicidad_reserva
@@ -11,15 +11,54 @@ class AccountMove(models.Model):
     )
 
     def write(self, vals):
+        if "payment_state" not in vals and "state" not in vals:
+            return super().write(vals)
+        not_paid = self.filtered(lambda move: move.payment_state != "paid")
         res = super().write(vals)
-        if "payment_state" in vals or "state" in vals:
-            for move in self:
-                if (
-                    move.move_type == "out_invoice"
-                    and move.state == "posted"
-                    and move.payment_state == "paid"
-                    and move.suscripcion_ids
-                ):
-                    move.suscripcion_ids._update_state_from_invoice()
+        not_paid._update_suscripciones_paid()
+        if vals.get("state") == "cancel":
+            self._reset_publicidad_cuotas()
         return res
 
+    def unlink(self):
+        self._reset_publicidad_cuotas()
+        return super().unlink()
+
+    def _reset_publicidad_cuotas(self):
+        """Las cuotas de facturas canceladas o borradas vuelven a estar pendientes"""
+        self.env["publicidad.cuota"].sudo().search(
+            [("invoice_id", "in", self.ids)]
+        ).write({"state": "pending", "invoice_id": False})
+
+    def _invoice_paid_hook(self):
+        res = super()._invoice_paid_hook()
+        self._update_suscripciones_paid()
+        return res
+
+    def _update_suscripciones_paid(self):
+        """Propaga el pago de las facturas a sus suscripciones en un solo lote"""
+        paid = self.filtered(
+            lambda move: (
+                move.move_type == "out_invoice"
+                and move.state == "posted"
+                and move.payment_state == "paid"
+            )
+        )
+        # Cada factura de cuota referencia su suscripción en las líneas;
+        # invoice_id solo guarda la última factura emitida
+        suscripciones = (
+            paid.invoice_line_ids.publicidad_suscripcion_id | paid.suscripcion_ids
+        )
+        if suscripciones:
+            suscripciones.sudo()._update_state_from_invoice()
+        if paid:
+            cuotas = (
+                self.env["publicidad.cuota"]
+                .sudo()
+                .search([("invoice_id", "in", paid.ids), ("state", "=", "invoiced")])
+            )
+            cuotas.write({"state": "paid"})
+            # El anticipo facturado y pagado habilita la activación
+            cuotas.filtered(lambda cuota: cuota.numero == 0).suscripcion_id.write(
+                {"anticipo_recibido": True}
+            )
@@ -0,0 +1,17 @@
+from odoo import fields, models
+
+
+class AccountMoveLine(models.Model):
+    _inherit = "account.move.line"
+
+    publicidad_suscripcion_id = fields.Many2one(
+        comodel_name="publicidad.suscripcion",
+        string="Suscripción de publicidad",
+        index="btree_not_null",
+        copy=False,
+    )
+    publicidad_cuota = fields.Integer(
+        string="Cuota Facturada",
+        copy=False,
+        help="Número de cuota facturada (0 para pago único)",
+    )
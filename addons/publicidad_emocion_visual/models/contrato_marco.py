@@ -1,4 +1,8 @@
-from odoo import fields, models
+from odoo import api, fields, models, _
+from odoo.tools import SQL
+
+# Estados que cuentan como contratados
+CONTRACTED_STATES = ("waiting_payment", "confirmed", "active", "paused", "expired")
 
 
 class ContratoMarco(models.Model):
@@ -30,3 +34,95 @@ class ContratoMarco(models.Model):
         string="Suscripciones",
         help="Historial de suscripciones bajo este contrato",
     )
+
+    # Agregados almacenados
+    currency_id = fields.Many2one(
+        "res.currency",
+        default=lambda self: self.env.company.currency_id,
+        readonly=True,
+    )
+    valor_contratado = fields.Monetary(
+        string="Valor Contratado",
+        compute="_compute_aggregates",
+        store=True,
+        currency_field="currency_id",
+        help="Suma del valor total de las suscripciones no borrador ni canceladas",
+    )
+    saldo_restante = fields.Monetary(
+        string="Saldo Restante",
+        compute="_compute_aggregates",
+        store=True,
+        currency_field="currency_id",
+    )
+    suscripcion_activa_count = fields.Integer(
+        string="Suscripciones Activas",
+        compute="_compute_aggregates",
+        store=True,
+    )
+    proxima_fecha_fin = fields.Date(
+        string="Próximo Vencimiento",
+        compute="_compute_aggregates",
+        store=True,
+        help="Fecha de fin más próxima entre las suscripciones confirmadas o activas",
+    )
+
+    @api.depends(
+        "suscripcion_ids.state",
+        "suscripcion_ids.valor_total",
+        "suscripcion_ids.saldo_restante",
+        "suscripcion_ids.fecha_fin",
+    )
+    def _compute_aggregates(self):
+        """Agregados de todo el lote con una única consulta agrupada"""
+        ids = tuple(rec._origin.id for rec in self if rec._origin.id)
+        aggregates = {}
+        if ids:
+            Suscripcion = self.env["publicidad.suscripcion"]
+            Suscripcion.flush_model(
+                [
+                    "contrato_marco_id",
+                    "state",
+                    "valor_total",
+                    "saldo_restante",
+                    "fecha_fin",
+                ]
+            )
+            self.env.cr.execute(
+                SQL(
+                    """
+                    SELECT contrato_marco_id,
+                           SUM(valor_total) FILTER (WHERE state IN %(contracted)s),
+                           SUM(saldo_restante) FILTER (WHERE state IN %(contracted)s),
+                           COUNT(*) FILTER (WHERE state = 'active'),
+                           MIN(fecha_fin) FILTER (WHERE state IN ('confirmed', 'active'))
+                      FROM %(table)s
+                     WHERE contrato_marco_id IN %(ids)s
+                  GROUP BY contrato_marco_id
+                    """,
+                    contracted=CONTRACTED_STATES,
+                    table=SQL.identifier(Suscripcion._table),
+                    ids=ids,
+                )
+            )
+            aggregates = {row[0]: row[1:] for row in self.env.cr.fetchall()}
+
+        for rec in self:
+            valor, saldo, activas, fecha_fin = aggregates.get(
+                rec._origin.id, (0.0, 0.0, 0, False)
+            )
+            rec.valor_contratado = valor or 0.0
+            rec.saldo_restante = saldo or 0.0
+            rec.suscripcion_activa_count = activas or 0
+            rec.proxima_fecha_fin = fecha_fin or False
+
+    def action_view_historial(self):
+        """Historial completo del contrato, incluidas las suscripciones archivadas"""
+        self.ensure_one()
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Historial de %s") % self.name,
+            "res_model": "publicidad.suscripcion",
+            "view_mode": "list,form",
+            "domain": [("contrato_marco_id", "=", self.id)],
+            "context": {"active_test": False, "default_contrato_marco_id": self.id},
+        }
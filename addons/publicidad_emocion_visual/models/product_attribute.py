@@ -0,0 +1,123 @@
+import unicodedata
+
+from odoo import api, fields, models
+
+
+def _normalize(name):
+    """Nombre en minúsculas, sin tildes y con guiones bajos"""
+    name = unicodedata.normalize("NFKD", name or "")
+    name = "".join(char for char in name if not unicodedata.combining(char))
+    return "_".join(name.lower().split())
+
+
+class ProductAttribute(models.Model):
+    _inherit = "product.attribute"
+
+    publicidad_campo = fields.Selection(
+        selection=[
+            ("centro_comercial", "Centro Comercial"),
+            ("ubicacion_macro", "Ubicación Macro"),
+            ("formato_id", "Formato"),
+            ("tipo_contenido", "Tipo de Contenido"),
+            ("tamano", "Tamaño / Dimensiones"),
+        ],
+        string="Campo de Publicidad",
+        compute="_compute_publicidad_campo",
+        store=True,
+        readonly=False,
+        index=True,
+        help="Campo del activo publicitario que alimenta este atributo. "
+        "Se detecta por nombre y puede corregirse manualmente.",
+    )
+
+    @api.depends("name")
+    def _compute_publicidad_campo(self):
+        for attribute in self:
+            name = _normalize(attribute.name)
+            if "centro" in name:
+                attribute.publicidad_campo = "centro_comercial"
+            elif "ubicacion" in name:
+                attribute.publicidad_campo = "ubicacion_macro"
+            elif "formato" in name:
+                attribute.publicidad_campo = "formato_id"
+            elif "tamano" in name:
+                attribute.publicidad_campo = "tamano"
+            elif "tipo" in name or "contenido" in name:
+                attribute.publicidad_campo = "tipo_contenido"
+            else:
+                attribute.publicidad_campo = False
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"publicidad_campo", "name"} & set(vals):
+            self.env.registry.clear_cache()
+            self.attribute_line_ids.product_tmpl_id._sync_publicidad_attributes()
+        return res
+
+
+class ProductAttributeValue(models.Model):
+    _inherit = "product.attribute.value"
+
+    publicidad_codigo = fields.Char(
+        string="Código de Publicidad",
+        compute="_compute_publicidad_codigo",
+        store=True,
+        readonly=False,
+        index=True,
+        help="Valor del campo de publicidad que representa (p. ej. viva, "
+        "fachada, video)",
+    )
+
+    @api.depends("name", "attribute_id.publicidad_campo")
+    def _compute_publicidad_codigo(self):
+        Template = self.env["product.template"]
+        for value in self:
+            campo = value.attribute_id.publicidad_campo
+            value.publicidad_codigo = False
+            if not campo or campo == "tamano":
+                continue
+            name = _normalize(value.name)
+            for key, label in Template._fields[campo].selection:
+                if name == key or key in name or _normalize(label) in name:
+                    value.publicidad_codigo = key
+                    break
+
+    def write(self, vals):
+        res = super().write(vals)
+        if {"publicidad_codigo", "name"} & set(vals):
+            self.env.registry.clear_cache()
+            self.pav_attribute_line_ids.product_tmpl_id._sync_publicidad_attributes()
+        return res
+
+
+class ProductTemplateAttributeLine(models.Model):
+    _inherit = "product.template.attribute.line"
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        lines.product_tmpl_id._sync_publicidad_attributes()
+        return lines
+
+    def write(self, vals):
+        templates = self.product_tmpl_id
+        res = super().write(vals)
+        (templates | self.product_tmpl_id)._sync_publicidad_attributes()
+        return res
+
+    def unlink(self):
+        templates = self.product_tmpl_id
+        res = super().unlink()
+        templates.exists()._sync_publicidad_attributes()
+        return res
+
+
+class ProductTemplateAttributeValue(models.Model):
+    _inherit = "product.template.attribute.value"
+
+    def write(self, vals):
+        res = super().write(vals)
+        # Invalida matriz de precios solo si cambian extras de variantes existentes
+        if {"price_extra", "ptav_active", "product_attribute_value_id"} & set(vals):
+            self.env.registry.clear_cache()
+        return res
@@ -0,0 +1,75 @@
+from odoo import fields, models
+from odoo.tools import SQL
+
+
+class ProductProduct(models.Model):
+    _inherit = "product.product"
+
+    publicidad_agenda_seq = fields.Integer(
+        string="Versión de Agenda",
+        readonly=True,
+        copy=False,
+        help="Se incrementa en cada reserva o confirmación del activo",
+    )
+
+    def write(self, vals):
+        res = super().write(vals)
+        # Invalida matriz de precios: las variantes nuevas no tienen cache
+        if "product_template_attribute_value_ids" in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def _get_physical_stock(self):
+        """Cantidad en ubicaciones internas por activo, en una sola consulta.
+
+        Evita recalcular ``qty_available`` producto a producto. Retorna None
+        si el módulo de inventario no está instalado.
+        """
+        if "stock.quant" not in self.env:
+            return None
+        if not self:
+            return {}
+        groups = (
+            self.env["stock.quant"]
+            .sudo()
+            ._read_group(
+                [
+                    ("product_id", "in", self.ids),
+                    ("location_id.usage", "=", "internal"),
+                ],
+                ["product_id"],
+                ["quantity:sum"],
+            )
+        )
+        return {product.id: quantity for product, quantity in groups}
+
+    def _lock_agenda(self):
+        """Serializa reservas y confirmaciones por activo sin bloquear a otros.
+
+        Bloquea las filas de los activos sin esperar (NOWAIT) e incrementa su
+        versión de agenda. Una transacción concurrente sobre el mismo activo
+        falla de inmediato con un error de concurrencia que Odoo reintenta; al
+        reintentar ya ve la reserva confirmada por la primera.
+        """
+        if not self:
+            return
+        ids = tuple(sorted(self.ids))
+        self.env.cr.execute(
+            SQL(
+                "SELECT id FROM %s WHERE id IN %s ORDER BY id FOR NO KEY UPDATE NOWAIT",
+                SQL.identifier(self._table),
+                ids,
+            )
+        )
+        self.env.cr.execute(
+            SQL(
+                """
+                UPDATE %s
+                   SET publicidad_agenda_seq = COALESCE(publicidad_agenda_seq, 0) + 1
+                 WHERE id IN %s
+                """,
+                SQL.identifier(self._table),
+                ids,
+            )
+        )
+        self.invalidate_recordset(["publicidad_agenda_seq"])
@@ -1,4 +1,4 @@
-from odoo import fields, models
+from odoo import api, fields, models
 
 
 class ProductTemplate(models.Model):
@@ -13,6 +13,7 @@ class ProductTemplate(models.Model):
             ("plaza_central", "Plaza Central"),
         ],
         string="Centro Comercial",
+        index=True,
     )
     ubicacion_macro = fields.Selection(
         selection=[
@@ -22,6 +23,7 @@ class ProductTemplate(models.Model):
             ("plazoleta", "Plazoleta de Comidas"),
         ],
         string="Ubicación Macro",
+        index=True,
     )
     basic_ubicacion_detalle = fields.Char(
         string="Ubicación Detalle",
@@ -35,6 +37,7 @@ class ProductTemplate(models.Model):
             ("totem", "Totem Digital"),
         ],
         string="Formato",
+        index=True,
     )
     tipo_contenido = fields.Selection(
         selection=[
@@ -43,6 +46,7 @@ class ProductTemplate(models.Model):
             ("hibrido", "Híbrido"),
         ],
         string="Tipo de Contenido",
+        index=True,
     )
     x_estado_tecnico = fields.Selection(
         selection=[
@@ -55,3 +59,38 @@ class ProductTemplate(models.Model):
         help="Estado técnico del activo físico.",
     )
     tamano = fields.Char(string="Tamaño / Dimensiones")
+
+    @api.model
+    def _sync_publicidad_catalog(self):
+        """Sincroniza todas las plantillas con atributos de publicidad"""
+        self.search(
+            [("attribute_line_ids.attribute_id.publicidad_campo", "!=", False)]
+        )._sync_publicidad_attributes()
+
+    def _sync_publicidad_attributes(self):
+        """Copia los atributos clasificados a los campos del activo.
+
+        Un campo solo se sincroniza cuando la plantilla tiene una línea de
+        atributo clasificada con un único valor; los campos sin línea
+        conservan el valor cargado a mano. Las plantillas con los mismos
+        valores se escriben juntas.
+        """
+        to_write = {}
+        for template in self:
+            vals = {}
+            for line in template.attribute_line_ids:
+                campo = line.attribute_id.publicidad_campo
+                if not campo or len(line.value_ids) != 1:
+                    continue
+                if campo == "tamano":
+                    value = line.value_ids.name
+                else:
+                    value = line.value_ids.publicidad_codigo
+                    if value not in dict(self._fields[campo].selection):
+                        continue
+                if template[campo] != value:
+                    vals[campo] = value
+            if vals:
+                to_write.setdefault(tuple(sorted(vals.items())), []).append(template.id)
+        for vals, ids in to_write.items():
+            self.browse(ids).write(dict(vals))
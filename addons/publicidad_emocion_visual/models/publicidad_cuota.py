@@ -0,0 +1,123 @@
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+# Estados con saldo por cobrar
+OPEN_STATES = ("pending", "invoiced")
+
+# Tramos de vencimiento (días): hasta, etiqueta
+AGING_BUCKETS = ((0, "current"), (30, "1_30"), (60, "31_60"), (90, "61_90"))
+
+
+class PublicidadCuota(models.Model):
+    _name = "publicidad.cuota"
+    _description = "Cuota de pago de suscripción de publicidad"
+    _order = "due_date, suscripcion_id, numero"
+    _sql_constraints = [
+        (
+            "suscripcion_numero_unique",
+            "UNIQUE (suscripcion_id, numero)",
+            "La suscripción ya tiene una cuota con ese número.",
+        ),
+    ]
+
+    suscripcion_id = fields.Many2one(
+        comodel_name="publicidad.suscripcion",
+        string="Suscripción",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    partner_id = fields.Many2one(
+        related="suscripcion_id.partner_id",
+        store=True,
+        index=True,
+    )
+    contrato_marco_id = fields.Many2one(
+        related="suscripcion_id.contrato_marco_id",
+        store=True,
+    )
+    numero = fields.Integer(
+        string="Cuota",
+        required=True,
+        help="Número de cuota (0 para el anticipo)",
+    )
+    due_date = fields.Date(string="Vencimiento", required=True)
+    currency_id = fields.Many2one(related="suscripcion_id.currency_id")
+    amount = fields.Monetary(string="Monto", currency_field="currency_id")
+    state = fields.Selection(
+        selection=[
+            ("pending", "Pendiente"),
+            ("invoiced", "Facturada"),
+            ("paid", "Pagada"),
+            ("cancel", "Cancelada"),
+        ],
+        string="Estado",
+        default="pending",
+        required=True,
+    )
+    invoice_id = fields.Many2one(
+        comodel_name="account.move",
+        string="Factura",
+        index="btree_not_null",
+        copy=False,
+    )
+
+    def init(self):
+        # Índice de cartera: vencimientos por estado
+        create_index(
+            self.env.cr,
+            "publicidad_cuota_due_date_state_idx",
+            self._table,
+            ["due_date", "state"],
+        )
+
+    @api.model
+    def get_aging(self, date_ref=None):
+        """Cartera vencida por cliente en tramos, con una sola consulta agrupada.
+
+        Retorna una lista de dicts con el saldo por vencer (``current``) y los
+        tramos ``1_30``, ``31_60``, ``61_90`` y ``90_plus`` días de atraso.
+        """
+        self.check_access("read")
+        date_ref = fields.Date.to_date(date_ref) or fields.Date.context_today(self)
+        self.flush_model(["partner_id", "due_date", "amount", "state"])
+        days = SQL("(%s::date - c.due_date)", date_ref)
+        buckets = []
+        lower = None
+        for upper, label in AGING_BUCKETS:
+            condition = SQL("%s <= %s", days, upper)
+            if lower is not None:
+                condition = SQL("%s > %s AND %s", days, lower, condition)
+            buckets.append(
+                SQL(
+                    "COALESCE(SUM(c.amount) FILTER (WHERE %s), 0) AS %s",
+                    condition,
+                    SQL.identifier(label),
+                )
+            )
+            lower = upper
+        buckets.append(
+            SQL(
+                "COALESCE(SUM(c.amount) FILTER (WHERE %s > %s), 0) AS %s",
+                days,
+                lower,
+                SQL.identifier("90_plus"),
+            )
+        )
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT c.partner_id, p.name, %(buckets)s, SUM(c.amount) AS total
+                  FROM %(table)s c
+                  JOIN res_partner p ON p.id = c.partner_id
+                 WHERE c.state IN %(states)s
+              GROUP BY c.partner_id, p.name
+              ORDER BY total DESC
+                """,
+                buckets=SQL(", ").join(buckets),
+                table=SQL.identifier(self._table),
+                states=OPEN_STATES,
+            )
+        )
+        return self.env.cr.dictfetchall()
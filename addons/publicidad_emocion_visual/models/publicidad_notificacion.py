@@ -0,0 +1,156 @@
+import threading
+from collections import defaultdict
+
+from odoo import api, fields, models
+
+# Notificaciones por lote del cron
+NOTIFICATION_BATCH_SIZE = 200
+
+
+class PublicidadNotificacion(models.Model):
+    _name = "publicidad.notificacion"
+    _description = "Notificación de chatter pendiente de publicidad"
+    _order = "id"
+
+    suscripcion_id = fields.Many2one(
+        comodel_name="publicidad.suscripcion",
+        required=True,
+        ondelete="cascade",
+    )
+    body = fields.Text(required=True)
+    message_type = fields.Char(default="notification", required=True)
+    subtype_xmlid = fields.Char(default="mail.mt_note", required=True)
+    author_id = fields.Many2one(comodel_name="res.partner")
+
+    @api.model
+    def _enqueue(
+        self,
+        suscripciones,
+        body,
+        message_type="notification",
+        subtype_xmlid="mail.mt_note",
+    ):
+        """Encola una notificación por suscripción y despierta al cron"""
+        if not suscripciones:
+            return
+        author_id = self.env.user.partner_id.id
+        self.sudo().create(
+            [
+                {
+                    "suscripcion_id": rec.id,
+                    "body": body,
+                    "message_type": message_type,
+                    "subtype_xmlid": subtype_xmlid,
+                    "author_id": author_id,
+                }
+                for rec in suscripciones
+            ]
+        )
+        self.env.ref("publicidad_emocion_visual.ir_cron_send_notificaciones")._trigger()
+
+    @api.model
+    def _cron_send(self, batch_size=NOTIFICATION_BATCH_SIZE):
+        """Publica las notificaciones pendientes por lotes.
+
+        Las notas internas (``mail.mt_note``) no notifican a seguidores y se
+        registran con un ``_message_log_batch`` por cuerpo y autor. Los
+        comentarios se publican en bloque con ``_post_comments``.
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        Suscripcion = self.env["publicidad.suscripcion"]
+        while True:
+            pending = self.search([], limit=batch_size)
+            if not pending:
+                break
+            notes = pending.filtered(lambda item: item.subtype_xmlid == "mail.mt_note")
+            logs = defaultdict(list)
+            for item in notes:
+                key = (item.body, item.author_id.id, item.message_type)
+                logs[key].append(item.suscripcion_id.id)
+            for (body, author_id, message_type), ids in logs.items():
+                Suscripcion.browse(ids)._message_log_batch(
+                    bodies=dict.fromkeys(ids, body),
+                    author_id=author_id,
+                    message_type=message_type,
+                )
+            (pending - notes)._post_comments()
+            pending.unlink()
+            if auto_commit:
+                self.env.cr.commit()
+
+    def _post_comments(self):
+        """Publica los comentarios agrupados por cuerpo, autor y subtipo.
+
+        Los seguidores de todo el grupo se resuelven con una sola consulta y
+        los mensajes y notificaciones de bandeja de entrada se crean con un
+        ``create()`` cada uno. Las suscripciones con algún seguidor notificado
+        por correo pasan por ``message_post``, que renderiza y encola el
+        correo de cada registro.
+        """
+        Suscripcion = self.env["publicidad.suscripcion"].with_context(
+            mail_notify_force_send=False
+        )
+        groups = defaultdict(list)
+        for item in self:
+            key = (item.body, item.author_id.id, item.message_type, item.subtype_xmlid)
+            groups[key].append(item.suscripcion_id.id)
+
+        for (body, author_id, message_type, subtype_xmlid), ids in groups.items():
+            records = Suscripcion.browse(ids)
+            subtype_id = self.env["ir.model.data"]._xmlid_to_res_id(subtype_xmlid)
+            recipient_data = self.env["mail.followers"]._get_recipient_data(
+                records, message_type, subtype_id
+            )
+            inbox = {}
+            by_email = Suscripcion
+            for rec in records:
+                recipients = [
+                    data
+                    for pid, data in recipient_data.get(rec.id, {}).items()
+                    if pid and pid != author_id and data["active"] is not False
+                ]
+                if any(data["notif"] == "email" for data in recipients):
+                    by_email |= rec
+                else:
+                    inbox[rec.id] = [
+                        data["id"] for data in recipients if data["notif"] == "inbox"
+                    ]
+
+            for rec in by_email:
+                rec.message_post(
+                    body=body,
+                    message_type=message_type,
+                    subtype_xmlid=subtype_xmlid,
+                    author_id=author_id,
+                )
+
+            records -= by_email
+            if not records:
+                continue
+            author_id, email_from = records._message_compute_author(author_id)
+            messages = records.sudo()._message_create(
+                [
+                    {
+                        "author_id": author_id,
+                        "email_from": email_from,
+                        "model": records._name,
+                        "res_id": rec.id,
+                        "body": body,
+                        "message_type": message_type,
+                        "subtype_id": subtype_id,
+                    }
+                    for rec in records
+                ]
+            )
+            self.env["mail.notification"].sudo().create(
+                [
+                    {
+                        "author_id": author_id,
+                        "mail_message_id": message.id,
+                        "res_partner_id": partner_id,
+                        "notification_type": "inbox",
+                    }
+                    for message in messages
+                    for partner_id in inbox[message.res_id]
+                ]
+            )
@@ -0,0 +1,23 @@
+from dateutil.relativedelta import relativedelta
+from odoo import api, fields, models
+
+# Días de retención de las mediciones
+PERF_LOG_RETENTION_DAYS = 30
+
+
+class PublicidadPerfLog(models.Model):
+    _name = "publicidad.perf.log"
+    _description = "Medición de rendimiento de publicidad"
+    _order = "create_date desc, id desc"
+
+    name = fields.Char(string="Operación", required=True, index=True)
+    duration_ms = fields.Float(string="Duración (ms)", aggregator="avg")
+    query_count = fields.Integer(string="Consultas SQL", aggregator="avg")
+    record_count = fields.Integer(string="Registros", aggregator="avg")
+    user_id = fields.Many2one(comodel_name="res.users", string="Usuario")
+
+    @api.autovacuum
+    def _gc_perf_logs(self):
+        """Elimina mediciones antiguas"""
+        limit = fields.Datetime.now() - relativedelta(days=PERF_LOG_RETENTION_DAYS)
+        self.search([("create_date", "<", limit)]).unlink()
@@ -0,0 +1,111 @@
+from odoo import api, fields, models
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+# Minutos de vigencia de una reserva temporal
+HOLD_TTL_PARAM = "publicidad_emocion_visual.hold_ttl_minutes"
+HOLD_TTL_MINUTES = 30
+
+
+class PublicidadReserva(models.Model):
+    _name = "publicidad.reserva"
+    _description = "Reserva temporal de activo publicitario"
+    _order = "expires_at"
+
+    suscripcion_id = fields.Many2one(
+        comodel_name="publicidad.suscripcion",
+        string="Suscripción",
+        required=True,
+        index=True,
+        ondelete="cascade",
+    )
+    product_id = fields.Many2one(
+        comodel_name="product.product",
+        string="Activo Publicitario",
+        required=True,
+        ondelete="cascade",
+    )
+    fecha_inicio = fields.Date(string="Fecha de inicio", required=True)
+    fecha_fin = fields.Date(string="Fecha de fin", required=True)
+    expires_at = fields.Datetime(string="Expira", required=True, index=True)
+    user_id = fields.Many2one(
+        comodel_name="res.users",
+        string="Asesor",
+        default=lambda self: self.env.user,
+    )
+
+    def init(self):
+        # Búsqueda de reservas vigentes por activo y rango
+        create_index(
+            self.env.cr,
+            "publicidad_reserva_product_range_idx",
+            self._table,
+            ["product_id", "fecha_inicio", "fecha_fin", "expires_at"],
+        )
+
+    @api.model
+    def _get_ttl(self):
+        try:
+            return int(
+                self.env["ir.config_parameter"]
+                .sudo()
+                .get_param(HOLD_TTL_PARAM, HOLD_TTL_MINUTES)
+            )
+        except ValueError:
+            return HOLD_TTL_MINUTES
+
+    @api.model
+    def _search_conflicts(self, slots):
+        """Reservas vigentes de otras suscripciones que cruzan los slots dados.
+
+        ``slots`` es una lista de tuplas ``(product_id, fecha_inicio,
+        fecha_fin, suscripcion_id)``; retorna {índice del slot: reservas}.
+        """
+        if not slots:
+            return {}
+        product_ids, starts, ends, suscripcion_ids = zip(*slots)
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT req.idx, ARRAY_AGG(hold.id ORDER BY hold.fecha_inicio)
+                  FROM UNNEST(%(products)s::int[], %(starts)s::date[],
+                              %(ends)s::date[], %(suscripciones)s::int[])
+                       WITH ORDINALITY
+                       AS req(product_id, fecha_inicio, fecha_fin, suscripcion_id, idx)
+                  JOIN %(table)s hold
+                    ON hold.product_id = req.product_id
+                   AND hold.suscripcion_id != req.suscripcion_id
+                   AND hold.fecha_inicio <= req.fecha_fin
+                   AND hold.fecha_fin >= req.fecha_inicio
+                   AND hold.expires_at > %(now)s
+              GROUP BY req.idx
+                """,
+                products=list(product_ids),
+                starts=list(starts),
+                ends=list(ends),
+                suscripciones=list(suscripcion_ids),
+                table=SQL.identifier(self._table),
+                now=fields.Datetime.now(),
+            )
+        )
+        return {
+            idx - 1: self.browse(hold_ids) for idx, hold_ids in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def _cron_sweep(self):
+        """Elimina las reservas vencidas con un único DELETE indexado.
+
+        Las reservas vencidas ya no bloquean la agenda (todas las consultas
+        filtran por ``expires_at``); el barrido solo mantiene la tabla chica.
+        """
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                "DELETE FROM %s WHERE expires_at <= %s",
+                SQL.identifier(self._table),
+                fields.Datetime.now(),
+            )
+        )
+        self.invalidate_model()
@@ -1,6 +1,49 @@
+import logging
+import threading
+import time
+from collections import defaultdict
+
+import psycopg2
 from dateutil.relativedelta import relativedelta
-from odoo import api, fields, models, _
-from odoo.exceptions import ValidationError
+from odoo import Command, api, fields, models, tools, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+
+from ..perf import profiled
+
+_logger = logging.getLogger(__name__)
+
+# Estados que ocupan el activo en la agenda
+AGENDA_STATES = ("confirmed", "active")
+
+# Estados que cuentan como ocupación
+REPORT_STATES = ("confirmed", "active", "paused", "expired")
+
+# Estados que se facturan
+INVOICEABLE_STATES = ("waiting_payment", "confirmed", "active")
+
+# Tamaño de lote para recálculos diferidos
+RECOMPUTE_BATCH_SIZE = 500
+
+# Clave de precommit con los registros en modo masivo
+BULK_TRACKING_KEY = "publicidad.suscripcion.bulk_tracking"
+
+# Presupuesto por ejecución de cron (limit_time_cpu = 60)
+CRON_TIME_BUDGET = 45
+
+# Estados visibles en la línea de tiempo de reservas
+TIMELINE_STATES = ("waiting_payment", "confirmed", "active", "paused", "expired")
+
+# Activos por página de la línea de tiempo
+TIMELINE_PAGE_SIZE = 40
+
+# Estados que se archivan pasado el horizonte de historial
+ARCHIVE_STATES = ("expired", "cancel")
+
+# Meses de historial visible antes de archivar
+ARCHIVE_HORIZON_PARAM = "publicidad_emocion_visual.archive_horizon_months"
+ARCHIVE_HORIZON_MONTHS = 24
 
 
 class PublicidadSuscripcion(models.Model):
@@ -8,8 +51,23 @@ class PublicidadSuscripcion(models.Model):
     _description = "Suscripción de pauta publicitaria"
     _inherit = ["mail.thread", "mail.activity.mixin"]
     _order = "fecha_inicio desc, id desc"
+    _sql_constraints = [
+        (
+            "agenda_no_overlap",
+            "EXCLUDE USING gist ("
+            "product_id WITH =, daterange(fecha_inicio, fecha_fin, '[]') WITH &&"
+            ") WHERE (state IN ('confirmed', 'active') AND fecha_fin IS NOT NULL)",
+            "Bloqueo de Agenda: El activo ya está reservado en esas fechas.",
+        ),
+    ]
 
     # 1.1 Identificación
+    active = fields.Boolean(
+        string="Activo",
+        default=True,
+        help="Las suscripciones vencidas o canceladas se archivan pasado el "
+        "horizonte de historial",
+    )
     name = fields.Char(
         string="Referencia",
         required=True,
@@ -125,9 +183,15 @@ class PublicidadSuscripcion(models.Model):
         tracking=True,
         help="Precio base + extras de atributos (Video, etc.)",
     )
+    precio_pendiente = fields.Boolean(
+        string="Precio Pendiente",
+        copy=False,
+        readonly=True,
+        help="Marcada para recálculo diferido tras un cambio de tarifas",
+    )
     valor_total = fields.Monetary(
         string="Valor Total",
-        compute="_compute_valor_total",
+        compute="_compute_financials",
         store=True,
         currency_field="currency_id",
     )
@@ -154,7 +218,7 @@ class PublicidadSuscripcion(models.Model):
     )
     valor_cuota = fields.Monetary(
         string="Valor por Cuota",
-        compute="_compute_valor_cuota",
+        compute="_compute_financials",
         store=True,
         currency_field="currency_id",
         help="Monto de cada cuota (calculado automáticamente)",
@@ -165,7 +229,7 @@ class PublicidadSuscripcion(models.Model):
     )
     monto_anticipo = fields.Monetary(
         string="Monto Anticipo",
-        compute="_compute_monto_anticipo",
+        compute="_compute_financials",
         store=True,
         currency_field="currency_id",
     )
@@ -191,7 +255,7 @@ class PublicidadSuscripcion(models.Model):
     )
     saldo_restante = fields.Monetary(
         string="Saldo Restante",
-        compute="_compute_saldo_restante",
+        compute="_compute_financials",
         store=True,
         currency_field="currency_id",
         help="Saldo después de descontar el anticipo (valor_total - monto_anticipo)",
@@ -200,6 +264,7 @@ class PublicidadSuscripcion(models.Model):
     fecha_inicio = fields.Date(
         string="Fecha de inicio",
         required=True,
+        index=True,
         default=fields.Date.context_today,
     )
     fecha_fin = fields.Date(
@@ -207,6 +272,7 @@ class PublicidadSuscripcion(models.Model):
         compute="_compute_fecha_fin",
         store=True,
         readonly=True,
+        index=True,
     )
 
     # 1.5 Estados y Flujo
@@ -263,6 +329,23 @@ class PublicidadSuscripcion(models.Model):
         readonly=True,
         copy=False,
     )
+    reserva_ids = fields.One2many(
+        comodel_name="publicidad.reserva",
+        inverse_name="suscripcion_id",
+        string="Reservas Temporales",
+        readonly=True,
+    )
+    reserva_expira = fields.Datetime(
+        string="Reservado hasta",
+        compute="_compute_reserva_expira",
+        help="Vencimiento de la reserva temporal del activo durante la negociación",
+    )
+    cuota_ids = fields.One2many(
+        comodel_name="publicidad.cuota",
+        inverse_name="suscripcion_id",
+        string="Plan de Cuotas",
+        readonly=True,
+    )
 
     # --- LOGICA ---
 
@@ -286,23 +369,33 @@ class PublicidadSuscripcion(models.Model):
                 rec.name = f"SUB / {partner_name} / {product_ref}"
 
     @api.model_create_multi
+    @profiled()
     def create(self, vals_list):
-        for vals in vals_list:
-            if vals.get("name", "Nuevo") == "Nuevo":
+        to_name = [vals for vals in vals_list if vals.get("name", "Nuevo") == "Nuevo"]
+        if to_name:
+            # Nombres de clientes y activos en una consulta por modelo
+            partners = self.env["res.partner"].browse(
+                {vals["partner_id"] for vals in to_name if vals.get("partner_id")}
+            )
+            products = self.env["product.product"].browse(
+                {vals["product_id"] for vals in to_name if vals.get("product_id")}
+            )
+            partner_names = {partner.id: partner.name for partner in partners}
+            product_names = {product.id: product.name for product in products}
+            ubicacion_dict = dict(self._fields["ubicacion_macro"].selection)
+
+            for vals in to_name:
                 partner_name = "Cliente"
                 product_ref = "Activo"
                 ubicacion = ""
 
                 if "partner_id" in vals:
-                    partner = self.env["res.partner"].browse(vals["partner_id"])
-                    partner_name = partner.name or "S/C"
+                    partner_name = partner_names.get(vals["partner_id"]) or "S/C"
 
                 if "product_id" in vals:
-                    prod = self.env["product.product"].browse(vals["product_id"])
-                    product_ref = prod.name or "S/P"
+                    product_ref = product_names.get(vals["product_id"]) or "S/P"
 
-                if "ubicacion_macro" in vals and vals["ubicacion_macro"]:
-                    ubicacion_dict = dict(self._fields["ubicacion_macro"].selection)
+                if vals.get("ubicacion_macro"):
                     ubicacion = ubicacion_dict.get(vals["ubicacion_macro"], "")
 
                 if ubicacion:
@@ -310,38 +403,86 @@ class PublicidadSuscripcion(models.Model):
                 else:
                     vals["name"] = f"SUB / {partner_name} / {product_ref}"
 
-        return super().create(vals_list)
+        records = super().create(vals_list)
+        records._enqueue_report_refresh()
+        return records
+
+    def write(self, vals):
+        if set(vals) == {"active"}:
+            # Archivar no cambia ocupación ni facturación del reporte
+            return super().write(vals)
+        self._enqueue_report_refresh()
+        res = super().write(vals)
+        self._enqueue_report_refresh()
+        if vals.get("state") in AGENDA_STATES:
+            # La reserva temporal se convierte en ocupación en la misma transacción
+            self.env["publicidad.reserva"].sudo().search(
+                [("suscripcion_id", "in", self.ids)]
+            ).unlink()
+        if "anticipo_recibido" in vals:
+            self.env["publicidad.cuota"].sudo().search(
+                [
+                    ("suscripcion_id", "in", self.ids),
+                    ("numero", "=", 0),
+                    ("state", "in", ("pending", "paid")),
+                ]
+            ).write({"state": "paid" if vals["anticipo_recibido"] else "pending"})
+        return res
+
+    def unlink(self):
+        self._enqueue_report_refresh()
+        return super().unlink()
+
+    def _enqueue_report_refresh(self):
+        """Programa el refresco del reporte de ocupación de estos activos"""
+        products = self.filtered(lambda rec: rec.state in REPORT_STATES).product_id
+        if products:
+            self.env["publicidad.ocupacion.report"]._enqueue_refresh(products.ids)
+
+    @api.depends("reserva_ids.expires_at")
+    def _compute_reserva_expira(self):
+        now = fields.Datetime.now()
+        for rec in self:
+            vigentes = [
+                hold.expires_at for hold in rec.reserva_ids if hold.expires_at > now
+            ]
+            rec.reserva_expira = max(vigentes) if vigentes else False
 
     @api.depends("product_id")
+    @profiled()
     def _compute_technical_specs(self):
         """Extrae atributos técnicos readonly desde attribute_line_ids del inventario"""
+        specs = self._get_technical_specs(self.product_id)
         for rec in self:
-            rec.formato = ""
-            rec.tamano = ""
-
-            if not rec.product_id or not rec.product_id.product_tmpl_id:
-                continue
-
-            # Buscar en las líneas de atributos del template
-            for attr_line in rec.product_id.product_tmpl_id.attribute_line_ids:
-                attr_name = (
-                    attr_line.attribute_id.name.lower()
-                    if attr_line.attribute_id.name
-                    else ""
-                )
-
-                if "formato" in attr_name:
-                    # Obtener el valor específico para esta variante
-                    for ptav in rec.product_id.product_template_attribute_value_ids:
-                        if ptav.attribute_id == attr_line.attribute_id:
-                            rec.formato = ptav.product_attribute_value_id.name
-                            break
-
-                elif "tamaño" in attr_name or "tamano" in attr_name:
-                    for ptav in rec.product_id.product_template_attribute_value_ids:
-                        if ptav.attribute_id == attr_line.attribute_id:
-                            rec.tamano = ptav.product_attribute_value_id.name
-                            break
+            rec.formato, rec.tamano = specs.get(rec.product_id.id, ("", ""))
+
+    @api.model
+    def _get_technical_specs(self, products):
+        """Resuelve formato y tamaño una vez por variante distinta.
+
+        Las variantes y sus valores de atributo se leen en lote (prefetch),
+        por lo que el número de consultas no crece con el recordset.
+        """
+        ptavs = products.product_template_attribute_value_ids
+        ptavs.mapped("attribute_id.publicidad_campo")
+        ptavs.mapped("product_attribute_value_id.name")
+        products.product_tmpl_id.mapped("formato_id")
+        formatos = dict(self.env["product.template"]._fields["formato_id"].selection)
+
+        specs = {}
+        for product in products:
+            values = {"formato_id": "", "tamano": ""}
+            for ptav in product.product_template_attribute_value_ids:
+                campo = ptav.attribute_id.publicidad_campo
+                if campo in values and not values[campo]:
+                    values[campo] = ptav.product_attribute_value_id.name
+            # Sin atributo en la variante: campos sincronizados de la plantilla
+            template = product.product_tmpl_id
+            specs[product.id] = (
+                values["formato_id"] or formatos.get(template.formato_id, ""),
+                values["tamano"] or template.tamano or "",
+            )
+        return specs
 
     @api.depends(
         "product_id",
@@ -349,9 +490,23 @@ class PublicidadSuscripcion(models.Model):
         "centro_comercial",
         "ubicacion_macro",
         "duracion_meses",
+        "fecha_inicio",
     )
+    @profiled()
     def _compute_precio_mensual(self):
         """Motor de precios 100% reactivo con escala de prestigio y consulta dinámica al inventario"""
+        # Prefetch en lote de variantes y atributos
+        products = self.product_id
+        products.mapped("lst_price")
+        products.product_template_attribute_value_ids.mapped(
+            "product_attribute_value_id.publicidad_codigo"
+        )
+        products.product_template_attribute_value_ids.mapped(
+            "attribute_id.publicidad_campo"
+        )
+        tarifa_model = self.env["publicidad.tarifa.centro"]
+        tarifas = tarifa_model._get_current_tarifas()
+
         for rec in self:
             if not rec.product_id:
                 rec.precio_mensual = 0.0
@@ -360,50 +515,16 @@ class PublicidadSuscripcion(models.Model):
             # ===== 1. PRECIO BASE DEL ACTIVO =====
             # Incluye el list_price + extras de Tamaño y Formato ya configurados en la variante
             base_price = rec.product_id.lst_price
-            attribute_extras = (
-                rec.product_id.price_extra
-                if hasattr(rec.product_id, "price_extra")
-                else 0.0
-            )
 
             # ===== 2. ESCALA DE PRESTIGIO (CENTRO COMERCIAL) =====
-            prestige_surcharge = {
-                "buenavista": 1500000.0,  # Prestigio Diamante
-                "viva": 1000000.0,  # Prestigio Oro
-                "mallplaza": 500000.0,  # Prestigio Plata
-                "unico": 0.0,  # Base
-                "plaza_central": 0.0,  # Base
-            }.get(rec.centro_comercial, 0.0)
-
-            # ===== 3. CONSULTA DINÁMICA AL INVENTARIO (PRICE_EXTRA) =====
-            ubicacion_extra = 0.0
-            contenido_extra = 0.0
-
-            if rec.product_id.product_tmpl_id:
-                # Buscar en los atributos del template para extraer price_extra
-                for ptav in rec.product_id.product_template_attribute_value_ids:
-                    if not ptav.attribute_id or not ptav.product_attribute_value_id:
-                        continue
+            prestige_surcharge = tarifa_model._get_recargo(
+                rec.centro_comercial, rec.fecha_inicio, tarifas
+            )
 
-                    attr_name = ptav.attribute_id.name.lower().strip()
-                    value_name = ptav.product_attribute_value_id.name.lower().strip()
-
-                    # UBICACIÓN: Buscar atributo 'ubicacion' exactamente
-                    if attr_name == "ubicacion" or "ubicación" in attr_name:
-                        if rec.ubicacion_macro:
-                            ubicacion_selected = rec.ubicacion_macro.lower().strip()
-                            # Verificar si el valor del atributo coincide con la selección
-                            if (
-                                ubicacion_selected in value_name
-                                or value_name in ubicacion_selected
-                            ):
-                                ubicacion_extra += ptav.price_extra
-                                break  # Solo tomar el primero que coincida
-
-                    # TIPO DE CONTENIDO: Buscar atributo 'tipo' o 'contenido'
-                    if "tipo" in attr_name or "contenido" in attr_name:
-                        if rec.tipo_contenido == "video" and "video" in value_name:
-                            contenido_extra += ptav.price_extra
+            # ===== 3. MATRIZ DE PRECIOS CACHEADA (PRICE_EXTRA) =====
+            ubicacion_extra, contenido_extra = rec._get_attribute_extras(
+                rec.product_id.id, rec.ubicacion_macro, rec.tipo_contenido
+            )
 
             # ===== 4. CÁLCULO FINAL =====
             # FÓRMULA: base + prestige + (ubicacion_extra o manual) + (contenido_extra o manual)
@@ -425,37 +546,57 @@ class PublicidadSuscripcion(models.Model):
                 + final_contenido  # Extra por Video
             )
 
+    def _get_attribute_extras(self, product_id, ubicacion_macro, tipo_contenido):
+        """Extras (ubicación, contenido) del activo desde la matriz cacheada"""
+        matrix = self._get_pricing_matrix(product_id)
+        ubicacion_extra = matrix["ubicacion"].get(ubicacion_macro, 0.0)
+        contenido_extra = matrix["video"] if tipo_contenido == "video" else 0.0
+        return ubicacion_extra, contenido_extra
+
+    @tools.ormcache("product_id")
+    def _get_pricing_matrix(self, product_id):
+        """Resuelve una sola vez los price_extra de ubicación y video del activo.
+
+        Solo guarda códigos y montos, que no dependen del idioma: la clave es
+        el activo. Se invalida al escribir variantes o valores de atributos
+        (ver ``product.product`` y ``product.template.attribute.value``).
+        """
+        product = self.env["product.product"].browse(product_id)
+        ubicacion = {}
+        video = 0.0
+        for ptav in product.product_template_attribute_value_ids:
+            campo = ptav.attribute_id.publicidad_campo
+            codigo = ptav.product_attribute_value_id.publicidad_codigo
+            if not campo or not codigo:
+                continue
+            # UBICACIÓN: Solo el primer valor por ubicación macro
+            if campo == "ubicacion_macro":
+                ubicacion.setdefault(codigo, ptav.price_extra)
+            # TIPO DE CONTENIDO: extra por video
+            elif campo == "tipo_contenido" and codigo == "video":
+                video += ptav.price_extra
+
+        return tools.frozendict(ubicacion=tools.frozendict(ubicacion), video=video)
+
     @api.onchange("product_id")
     def _onchange_product_id(self):
         """Pre-carga inteligente al seleccionar activo"""
         if self.product_id:
-            # Pre-cargar centro comercial si hay atributo de ubicación
-            if self.product_id.product_tmpl_id:
-                for attr_line in self.product_id.product_tmpl_id.attribute_line_ids:
-                    attr_name = (
-                        attr_line.attribute_id.name.lower()
-                        if attr_line.attribute_id.name
-                        else ""
-                    )
-
-                    if "ubicacion" in attr_name or "centro" in attr_name:
-                        for (
-                            ptav
-                        ) in self.product_id.product_template_attribute_value_ids:
-                            if ptav.attribute_id == attr_line.attribute_id:
-                                val_name = ptav.product_attribute_value_id.name.lower()
-
-                                if "viva" in val_name:
-                                    self.centro_comercial = "viva"
-                                elif "buenavista" in val_name:
-                                    self.centro_comercial = "buenavista"
-                                elif "mallplaza" in val_name:
-                                    self.centro_comercial = "mallplaza"
-                                elif "unico" in val_name:
-                                    self.centro_comercial = "unico"
-                                elif "plaza" in val_name and "central" in val_name:
-                                    self.centro_comercial = "plaza_central"
-                                break
+            # Valores clasificados de la variante o, en su defecto, de la plantilla
+            template = self.product_id.product_tmpl_id
+            codigos = {
+                ptav.attribute_id.publicidad_campo: (
+                    ptav.product_attribute_value_id.publicidad_codigo
+                )
+                for ptav in self.product_id.product_template_attribute_value_ids
+                if ptav.product_attribute_value_id.publicidad_codigo
+            }
+            centro = codigos.get("centro_comercial") or template.centro_comercial
+            if centro:
+                self.centro_comercial = centro
+            ubicacion = codigos.get("ubicacion_macro") or template.ubicacion_macro
+            if ubicacion:
+                self.ubicacion_macro = ubicacion
 
     @api.onchange("tipo_contenido")
     def _onchange_tipo_contenido(self):
@@ -473,47 +614,111 @@ class PublicidadSuscripcion(models.Model):
             # Volver al precio base si cambia a estático
             self.precio_mensual = self.product_id.lst_price
 
-    @api.depends("valor_total", "porcentaje_anticipo", "numero_cuotas")
-    def _compute_valor_cuota(self):
-        """Calcula el valor de cada cuota sobre el SALDO RESTANTE (valor_total - monto_anticipo)"""
-        for rec in self:
-            if rec.numero_cuotas and rec.numero_cuotas > 0:
-                # Calcular saldo restante en línea para evitar dependencias circulares
-                monto_anticipo = (
-                    rec.valor_total * (rec.porcentaje_anticipo / 100.0)
-                    if rec.porcentaje_anticipo > 0
-                    else 0.0
-                )
-                saldo_pendiente = rec.valor_total - monto_anticipo
-                rec.valor_cuota = saldo_pendiente / rec.numero_cuotas
-            else:
-                rec.valor_cuota = 0.0
-
-    @api.depends("duracion_meses", "precio_mensual")
-    def _compute_valor_total(self):
+    @api.depends(
+        "duracion_meses",
+        "precio_mensual",
+        "porcentaje_anticipo",
+        "numero_cuotas",
+    )
+    @profiled()
+    def _compute_financials(self):
+        """Motor financiero: valor total, anticipo, saldo y cuota en una pasada"""
         for rec in self:
             try:
                 months = int(rec.duracion_meses or 0)
             except ValueError:
                 months = 0
-            rec.valor_total = rec.precio_mensual * months
-
-    @api.depends("valor_total", "monto_anticipo")
-    def _compute_saldo_restante(self):
-        """Calcula el saldo restante después de descontar el anticipo"""
-        for rec in self:
-            rec.saldo_restante = rec.valor_total - rec.monto_anticipo
+            valor_total = rec.precio_mensual * months
 
-    @api.depends("valor_total", "porcentaje_anticipo")
-    def _compute_monto_anticipo(self):
-        """Calcula el monto del anticipo basado en el porcentaje"""
-        for rec in self:
             # FÓRMULA EXACTA: monto_anticipo = valor_total * (porcentaje_anticipo / 100)
             # Si porcentaje_anticipo es 0, el monto DEBE ser 0
-            if rec.porcentaje_anticipo > 0:
-                rec.monto_anticipo = rec.valor_total * (rec.porcentaje_anticipo / 100.0)
-            else:
-                rec.monto_anticipo = 0.0
+            monto_anticipo = (
+                valor_total * (rec.porcentaje_anticipo / 100.0)
+                if rec.porcentaje_anticipo > 0
+                else 0.0
+            )
+            saldo_restante = valor_total - monto_anticipo
+
+            rec.valor_total = valor_total
+            rec.monto_anticipo = monto_anticipo
+            rec.saldo_restante = saldo_restante
+            # Cuotas sobre el SALDO RESTANTE
+            rec.valor_cuota = (
+                saldo_restante / rec.numero_cuotas
+                if rec.numero_cuotas and rec.numero_cuotas > 0
+                else 0.0
+            )
+
+    @api.model
+    def _repair_financial_amounts(self, batch_size=RECOMPUTE_BATCH_SIZE):
+        """Repara los montos financieros almacenados de toda la tabla.
+
+        Aplica la misma fórmula que ``_compute_financials`` directamente en
+        SQL, por bloques de ``batch_size`` registros con commit intermedio.
+        Pensado para ejecutarse tras un cambio de precios masivo.
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        self.flush_model()
+        last_id = 0
+        while True:
+            self.env.cr.execute(
+                SQL(
+                    """
+                    WITH chunk AS (
+                        SELECT s.id,
+                               s.numero_cuotas,
+                               s.porcentaje_anticipo,
+                               cur.rounding,
+                               COALESCE(s.precio_mensual, 0)
+                                   * COALESCE(NULLIF(s.duracion_meses, ''), '0')::int
+                                   AS total
+                          FROM %(table)s s
+                     LEFT JOIN res_currency cur ON cur.id = s.currency_id
+                         WHERE s.id > %(last_id)s
+                      ORDER BY s.id
+                         LIMIT %(limit)s
+                    ), amounts AS (
+                        SELECT id,
+                               numero_cuotas,
+                               COALESCE(rounding, 0.01) AS rounding,
+                               total,
+                               CASE WHEN porcentaje_anticipo > 0
+                                    THEN total * porcentaje_anticipo / 100.0
+                                    ELSE 0 END AS anticipo
+                          FROM chunk
+                    )
+                    UPDATE %(table)s s
+                       SET valor_total = ROUND(a.total / a.rounding) * a.rounding,
+                           monto_anticipo = ROUND(a.anticipo / a.rounding) * a.rounding,
+                           saldo_restante = ROUND((a.total - a.anticipo) / a.rounding)
+                               * a.rounding,
+                           valor_cuota = CASE WHEN a.numero_cuotas > 0
+                               THEN ROUND(
+                                   (a.total - a.anticipo) / a.numero_cuotas / a.rounding
+                               ) * a.rounding
+                               ELSE 0 END
+                      FROM amounts a
+                     WHERE s.id = a.id
+                 RETURNING s.id
+                    """,
+                    table=SQL.identifier(self._table),
+                    last_id=last_id,
+                    limit=batch_size,
+                )
+            )
+            ids = [row[0] for row in self.env.cr.fetchall()]
+            if not ids:
+                break
+            last_id = max(ids)
+
+            # Propagar a dependientes (agregados del contrato)
+            chunk = self.browse(ids)
+            fnames = ["valor_total", "monto_anticipo", "saldo_restante", "valor_cuota"]
+            chunk.invalidate_recordset(fnames)
+            chunk.modified(fnames)
+            self.env.flush_all()
+            if auto_commit:
+                self.env.cr.commit()
 
     @api.depends("fecha_inicio", "duracion_meses")
     def _compute_fecha_fin(self):
@@ -527,23 +732,489 @@ class PublicidadSuscripcion(models.Model):
             else:
                 rec.fecha_fin = False
 
+    def init(self):
+        # Índice parcial para búsquedas de agenda
+        create_index(
+            self.env.cr,
+            "publicidad_suscripcion_agenda_idx",
+            self._table,
+            ["product_id", "fecha_inicio", "fecha_fin"],
+            where="state IN ('confirmed', 'active')",
+        )
+        # Índice del listado por defecto sobre el conjunto vivo
+        create_index(
+            self.env.cr,
+            "publicidad_suscripcion_live_order_idx",
+            self._table,
+            ["fecha_inicio DESC", "id DESC"],
+            where="active",
+        )
+        # Índice de la línea de tiempo (ventana por activo)
+        create_index(
+            self.env.cr,
+            "publicidad_suscripcion_timeline_idx",
+            self._table,
+            ["product_id", "fecha_fin", "fecha_inicio"],
+            where="state NOT IN ('draft', 'cancel')",
+        )
+        create_index(
+            self.env.cr,
+            "publicidad_suscripcion_precio_pendiente_idx",
+            self._table,
+            ["id"],
+            where="precio_pendiente",
+        )
+
+    # --- SEGUIMIENTO EN LOTE ---
+
+    def _is_bulk_mode(self):
+        """Modo masivo: crons, importaciones o contexto explícito"""
+        return bool(
+            self.env.context.get("publicidad_bulk_mode")
+            or self.env.context.get("import_file")
+        )
+
+    def _track_prepare(self, fields_iter):
+        if self._is_bulk_mode():
+            self.env.cr.precommit.data.setdefault(BULK_TRACKING_KEY, set()).update(
+                self.ids
+            )
+        return super()._track_prepare(fields_iter)
+
+    def _message_track(self, fields_iter, initial_values_dict):
+        """En modo masivo registra el seguimiento con un único create() por lote.
+
+        Los registros preparados en modo masivo no pasan por ``_message_log``
+        individual: sus mensajes y valores de seguimiento se insertan juntos.
+        La edición interactiva conserva el comportamiento estándar del chatter.
+        """
+        bulk_ids = self.env.cr.precommit.data.pop(BULK_TRACKING_KEY, set())
+        bulk = self.filtered(lambda rec: rec.id in bulk_ids)
+        tracking = super(PublicidadSuscripcion, self - bulk)._message_track(
+            fields_iter, initial_values_dict
+        )
+        if not bulk or not fields_iter:
+            return tracking
+
+        tracked_fields = self.fields_get(
+            fields_iter, attributes=("string", "type", "selection", "currency_field")
+        )
+        subtype_id = self.env["ir.model.data"]._xmlid_to_res_id("mail.mt_note")
+        author_id = self.env.user.partner_id.id
+        message_vals = []
+        for rec in bulk.exists():
+            changes, tracking_value_ids = rec._mail_track(
+                tracked_fields, initial_values_dict[rec.id]
+            )
+            tracking[rec.id] = (changes, tracking_value_ids)
+            if changes:
+                message_vals.append(
+                    {
+                        "model": self._name,
+                        "res_id": rec.id,
+                        "message_type": "notification",
+                        "subtype_id": subtype_id,
+                        "author_id": author_id,
+                        "tracking_value_ids": tracking_value_ids,
+                    }
+                )
+        if message_vals:
+            self.env["mail.message"].sudo().create(message_vals)
+        return tracking
+
+    # --- RECÁLCULO DIFERIDO DE PRECIOS ---
+
+    @api.model
+    def _mark_precio_pendiente(self, centros):
+        """Marca los borradores de los centros dados para recálculo por lotes"""
+        self.flush_model(["state", "centro_comercial", "precio_pendiente"])
+        self.env.cr.execute(
+            SQL(
+                """
+                UPDATE %s
+                   SET precio_pendiente = TRUE
+                 WHERE state = 'draft'
+                   AND centro_comercial IN %s
+                   AND precio_pendiente IS NOT TRUE
+                """,
+                SQL.identifier(self._table),
+                tuple(centros),
+            )
+        )
+        self.invalidate_model(["precio_pendiente"])
+
+    @api.model
+    def _cron_recompute_precios(self, batch_size=RECOMPUTE_BATCH_SIZE):
+        """Recalcula precios pendientes por lotes con commit intermedio.
+
+        Cada lote se confirma por separado, por lo que el job puede
+        interrumpirse y retomarse sin bloquear toda la tabla; si el tiempo se
+        agota el cron se reprograma.
+        """
+        if not self._process_in_batches(
+            [("precio_pendiente", "=", True)],
+            lambda batch: batch._recompute_precio_batch(),
+            batch_size,
+            time.monotonic() + CRON_TIME_BUDGET,
+        ):
+            self.env.ref(
+                "publicidad_emocion_visual.ir_cron_recompute_precios"
+            )._trigger()
+
+    def _recompute_precio_batch(self):
+        self.env.add_to_compute(self._fields["precio_mensual"], self)
+        # Montos y agregados del contrato que dependen del precio
+        self.modified(["precio_mensual"])
+        self.write({"precio_pendiente": False})
+        self.flush_recordset()
+
+    # --- ARCHIVO DE HISTORIAL ---
+
+    @api.model
+    def _get_archive_horizon(self):
+        """Fecha límite de archivo según el parámetro de sistema (0 desactiva)"""
+        try:
+            months = int(
+                self.env["ir.config_parameter"]
+                .sudo()
+                .get_param(ARCHIVE_HORIZON_PARAM, ARCHIVE_HORIZON_MONTHS)
+            )
+        except ValueError:
+            months = ARCHIVE_HORIZON_MONTHS
+        if months <= 0:
+            return None
+        return fields.Date.context_today(self) - relativedelta(months=months)
+
+    @api.model
+    def _cron_archive(self, batch_size=RECOMPUTE_BATCH_SIZE):
+        """Archiva suscripciones vencidas o canceladas fuera del horizonte.
+
+        Las suscripciones archivadas salen del listado, del kanban y de las
+        búsquedas por defecto, pero siguen disponibles en el historial del
+        contrato marco y en los reportes.
+        """
+        horizon = self._get_archive_horizon()
+        if not horizon:
+            return
+        if not self._process_in_batches(
+            [("state", "in", ARCHIVE_STATES), ("fecha_fin", "<", horizon)],
+            lambda batch: batch.write({"active": False}),
+            batch_size,
+            time.monotonic() + CRON_TIME_BUDGET,
+        ):
+            self.env.ref("publicidad_emocion_visual.ir_cron_archive")._trigger()
+
+    # --- CICLO DE VIDA PROGRAMADO ---
+
+    @api.model
+    def _cron_update_lifecycle(self, batch_size=RECOMPUTE_BATCH_SIZE):
+        """Activa y vence suscripciones según sus fechas, por lotes.
+
+        Cada lote se escribe con un solo ``write()`` y se confirma por
+        separado; si el tiempo se agota el cron se reprograma y retoma desde
+        los registros aún pendientes.
+        """
+        today = fields.Date.context_today(self)
+        deadline = time.monotonic() + CRON_TIME_BUDGET
+        transitions = [
+            (
+                [
+                    ("state", "in", ["confirmed", "active", "paused"]),
+                    ("fecha_fin", "<", today),
+                ],
+                "expired",
+                _("Suscripción Vencida: La vigencia de la pauta ha finalizado."),
+            ),
+            (
+                [
+                    ("state", "=", "confirmed"),
+                    ("fecha_inicio", "<=", today),
+                    ("fecha_fin", ">=", today),
+                    ("estado_arte", "=", "approved"),
+                    "|",
+                    ("monto_anticipo", "=", 0),
+                    ("anticipo_recibido", "=", True),
+                ],
+                "active",
+                _("Suscripción en Exhibición: Activada automáticamente."),
+            ),
+        ]
+        for domain, state, body in transitions:
+            if not self._process_in_batches(
+                domain,
+                lambda batch, state=state, body=body: batch._apply_state_batch(
+                    state, body
+                ),
+                batch_size,
+                deadline,
+            ):
+                self.env.ref(
+                    "publicidad_emocion_visual.ir_cron_update_lifecycle"
+                )._trigger()
+                return
+
+    @api.model
+    def _process_in_batches(self, domain, callback, batch_size, deadline=None):
+        """Procesa los registros del dominio en lotes con commit intermedio.
+
+        El callback debe sacar los registros del dominio para poder retomar.
+        Si un lote falla se reintenta registro a registro, cada uno en su
+        savepoint; los que vuelven a fallar se registran en el log y se
+        omiten en el resto de la ejecución. Retorna False si se agotó el
+        tiempo antes de terminar.
+        """
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        bulk_self = self.with_context(publicidad_bulk_mode=True)
+        skipped = []
+        while True:
+            if deadline and time.monotonic() > deadline:
+                return False
+            batch = bulk_self.search(
+                domain + [("id", "not in", skipped)], limit=batch_size, order="id"
+            )
+            if not batch:
+                return True
+            try:
+                with self.env.cr.savepoint():
+                    callback(batch)
+            except (UserError, psycopg2.Error):
+                for rec in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            callback(rec)
+                    except (UserError, psycopg2.Error):
+                        _logger.exception(
+                            "%s: no se pudo procesar el registro %s, se omite",
+                            self._name,
+                            rec.id,
+                        )
+                        skipped.append(rec.id)
+            if auto_commit:
+                self.env.cr.commit()
+
+    def _apply_state_batch(self, state, body):
+        """Cambia el estado del lote y registra una nota por registro en bloque"""
+        self.write({"state": state})
+        self._message_log_batch(
+            bodies={rec.id: body for rec in self},
+            subtype_id=self.env.ref("mail.mt_note").id,
+        )
+
+    def _update_state_from_invoice(self):
+        """Confirma con un solo write las suscripciones cuya factura fue pagada"""
+        to_confirm = self.filtered(lambda rec: rec.state == "waiting_payment")
+        if to_confirm:
+            to_confirm.write({"state": "confirmed"})
+
+    # --- FACTURACIÓN ---
+
+    @api.model
+    def _cron_generate_invoices(self):
+        """Factura el periodo (mes) en curso para todas las suscripciones"""
+        self.with_context(publicidad_bulk_mode=True).search(
+            [("state", "in", INVOICEABLE_STATES)]
+        )._generate_invoices()
+
+    def action_generate_invoices(self):
+        """Factura las suscripciones seleccionadas para el periodo en curso"""
+        moves = self._generate_invoices()
+        action = self.env["ir.actions.act_window"]._for_xml_id(
+            "account.action_move_out_invoice_type"
+        )
+        action["domain"] = [("id", "in", moves.ids)]
+        return action
+
+    def _generate_invoices(self, date_to=None):
+        """Genera en un solo create() las facturas pendientes hasta date_to.
+
+        Las líneas se agrupan por cliente y contrato marco. Cada cuota ya
+        facturada (factura no cancelada) se omite, por lo que re-ejecutar el
+        proceso no duplica facturas.
+        """
+        date_to = date_to or fields.Date.end_of(
+            fields.Date.context_today(self), "month"
+        )
+        records = self.filtered(lambda rec: rec.state in INVOICEABLE_STATES)
+        if not records:
+            return self.env["account.move"]
+
+        invoiced = records._get_invoiced_cuotas()
+        tax = self.env.ref("publicidad_emocion_visual.publicidad_tax_15")
+        lines_by_key = defaultdict(list)
+        for rec in records:
+            for cuota, fecha, amount in rec._get_billing_schedule():
+                if fecha > date_to or (rec.id, cuota) in invoiced:
+                    continue
+                name = rec.name
+                if cuota:
+                    name = _("%(name)s - Cuota %(cuota)s/%(total)s") % {
+                        "name": rec.name,
+                        "cuota": cuota,
+                        "total": rec.numero_cuotas,
+                    }
+                elif rec.metodo_pago == "cuotas":
+                    if rec.anticipo_recibido:
+                        # Anticipo cobrado fuera de la facturación
+                        continue
+                    name = _("%(name)s - Anticipo") % {"name": rec.name}
+                lines_by_key[rec.partner_id, rec.contrato_marco_id].append(
+                    {
+                        "product_id": rec.product_id.id,
+                        "name": name,
+                        "quantity": 1,
+                        "price_unit": amount,
+                        "tax_ids": [Command.set(tax.ids)],
+                        "publicidad_suscripcion_id": rec.id,
+                        "publicidad_cuota": cuota,
+                    }
+                )
+        if not lines_by_key:
+            return self.env["account.move"]
+
+        moves = self.env["account.move"].create(
+            [
+                {
+                    "move_type": "out_invoice",
+                    "partner_id": partner.id,
+                    "invoice_origin": contrato.name or False,
+                    "invoice_line_ids": [Command.create(line) for line in lines],
+                }
+                for (partner, contrato), lines in lines_by_key.items()
+            ]
+        )
+        for move in moves:
+            move.invoice_line_ids.publicidad_suscripcion_id.write(
+                {"invoice_id": move.id}
+            )
+        records._mark_cuotas_invoiced(moves)
+        return moves
+
+    def _mark_cuotas_invoiced(self, moves):
+        """Enlaza las cuotas facturadas con su factura, un write por factura"""
+        cuotas = (
+            self.env["publicidad.cuota"]
+            .sudo()
+            .search(
+                [
+                    ("suscripcion_id", "in", self.ids),
+                    ("state", "=", "pending"),
+                ]
+            )
+        )
+        by_key = {(cuota.suscripcion_id.id, cuota.numero): cuota for cuota in cuotas}
+        for move in moves:
+            invoiced = cuotas.browse(
+                [
+                    by_key[key].id
+                    for key in {
+                        (line.publicidad_suscripcion_id.id, line.publicidad_cuota)
+                        for line in move.invoice_line_ids
+                    }
+                    if key in by_key
+                ]
+            )
+            invoiced.write({"state": "invoiced", "invoice_id": move.id})
+
+    def _generate_cuotas(self):
+        """Genera el plan de cuotas del lote con un solo create().
+
+        Usa el plan de ``_get_billing_schedule``: anticipo (cuota 0) y
+        cuotas mensuales. Las cuotas pendientes o canceladas se
+        regeneran; las facturadas o pagadas se conservan.
+        """
+        Cuota = self.env["publicidad.cuota"].sudo()
+        Cuota.search(
+            [
+                ("suscripcion_id", "in", self.ids),
+                ("state", "in", ("pending", "cancel")),
+            ]
+        ).unlink()
+        records = self.filtered(
+            lambda rec: rec.metodo_pago == "cuotas" and rec.numero_cuotas > 0
+        )
+        kept = {
+            (suscripcion.id, numero)
+            for suscripcion, numero in Cuota._read_group(
+                [("suscripcion_id", "in", records.ids)],
+                ["suscripcion_id", "numero"],
+            )
+        }
+        vals_list = []
+        for rec in records:
+            for numero, due_date, amount in rec._get_billing_schedule():
+                if (rec.id, numero) in kept:
+                    continue
+                vals_list.append(
+                    {
+                        "suscripcion_id": rec.id,
+                        "numero": numero,
+                        "due_date": due_date,
+                        "amount": amount,
+                        "state": "paid"
+                        if numero == 0 and rec.anticipo_recibido
+                        else "pending",
+                    }
+                )
+        return Cuota.create(vals_list)
+
+    def action_generate_cuotas(self):
+        self._generate_cuotas()
+
+    def _get_billing_schedule(self):
+        """Cuotas a facturar como [(número, fecha, monto)].
+
+        En pago por cuotas el 0 es el anticipo, si lo hay; en los demás
+        métodos es el pago único del valor total.
+        """
+        self.ensure_one()
+        if self.metodo_pago == "cuotas" and self.numero_cuotas > 0:
+            schedule = [
+                (
+                    cuota,
+                    self.fecha_inicio + relativedelta(months=cuota - 1),
+                    self.valor_cuota,
+                )
+                for cuota in range(1, self.numero_cuotas + 1)
+            ]
+            if self.monto_anticipo:
+                schedule.insert(0, (0, self.fecha_inicio, self.monto_anticipo))
+            return schedule
+        return [(0, self.fecha_inicio, self.valor_total)]
+
+    def _get_invoiced_cuotas(self):
+        """Conjunto {(suscripción, cuota)} ya facturado, en una sola consulta"""
+        self.env["account.move.line"].flush_model(
+            ["publicidad_suscripcion_id", "publicidad_cuota", "parent_state"]
+        )
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT DISTINCT publicidad_suscripcion_id, publicidad_cuota
+                  FROM account_move_line
+                 WHERE publicidad_suscripcion_id IN %s
+                   AND parent_state != 'cancel'
+                """,
+                tuple(self.ids),
+            )
+        )
+        return set(self.env.cr.fetchall())
+
     def _expand_states(self, states, domain, order):
         return [key for key, val in type(self).state.selection]
 
     # --- ACCIONES Y VALIDACIONES ---
 
     @api.constrains("state", "product_id", "fecha_inicio", "fecha_fin")
+    @profiled()
     def _check_availability_constrains(self):
         """Validaciones estrictas de disponibilidad"""
-        for rec in self:
-            if rec.state not in ["confirmed", "active"]:
-                continue
-
-            if not rec.product_id:
-                continue
-
+        records = self.filtered(
+            lambda rec: rec.state in AGENDA_STATES and rec.product_id
+        )
+        stock = records.product_id._get_physical_stock()
+        for rec in records:
             # 1. VALIDACIÓN DE STOCK FÍSICO
-            if rec.product_id.qty_available == 0:
+            if stock is not None and not stock.get(rec.product_id.id):
                 raise ValidationError(
                     _(
                         "Activo Fuera de Servicio: %(product)s no tiene stock disponible. "
@@ -568,60 +1239,529 @@ class PublicidadSuscripcion(models.Model):
                     % {"product": rec.product_id.display_name, "status": status_label}
                 )
 
-            # 3. VALIDACIÓN DE AGENDA (Conflicto de Fechas)
-            if rec.fecha_inicio and rec.fecha_fin:
-                domain_search = [
-                    ("product_id", "=", rec.product_id.id),
-                    ("state", "in", ["confirmed", "active"]),
-                    ("id", "!=", rec.id),
-                    ("fecha_inicio", "<=", rec.fecha_fin),
-                    ("fecha_fin", ">=", rec.fecha_inicio),
-                ]
-                conflict = self.search(domain_search, limit=1)
-
-                if conflict:
-                    start_str = conflict.fecha_inicio.strftime("%d/%m/%Y")
-                    end_str = conflict.fecha_fin.strftime("%d/%m/%Y")
-                    contrato_ref = (
-                        conflict.contrato_marco_id.name
-                        if conflict.contrato_marco_id
-                        else "Sin Contrato"
-                    )
-
-                    raise ValidationError(
+        # 3. VALIDACIÓN DE AGENDA (Conflicto de Fechas)
+        # Serializa por activo: una confirmación paralela del mismo activo se
+        # reintenta y ve la reserva ya confirmada
+        records.product_id._lock_agenda()
+        conflicts = self._get_agenda_conflicts()
+        if conflicts:
+            lines = []
+            for rec, others in conflicts.items():
+                for conflict in others:
+                    lines.append(
                         _(
-                            "Bloqueo de Agenda: El activo %(product)s ya está asignado al contrato %(contrato)s "
-                            "del %(start)s al %(end)s."
+                            "- %(product)s ya está asignado al contrato %(contrato)s "
+                            "del %(start)s al %(end)s (%(ref)s)."
                         )
                         % {
                             "product": rec.product_id.display_name,
-                            "contrato": contrato_ref,
-                            "start": start_str,
-                            "end": end_str,
+                            "contrato": conflict.contrato_marco_id.name
+                            or _("Sin Contrato"),
+                            "start": conflict.fecha_inicio.strftime("%d/%m/%Y"),
+                            "end": conflict.fecha_fin.strftime("%d/%m/%Y"),
+                            "ref": conflict.name,
                         }
                     )
+            raise ValidationError(
+                _("Bloqueo de Agenda: Se encontraron conflictos de fechas:\n%s")
+                % "\n".join(lines)
+            )
 
-    def action_request_approval(self):
-        """Solicita aprobación de finanzas y notifica"""
-        for rec in self:
-            rec.state = "waiting_payment"
-            # Notificación en el chatter
-            rec.message_post(
-                body=_(
-                    "Solicitud de Aprobación: El Asesor ha enviado esta suscripción para validación de pago."
-                ),
-                message_type="comment",
-                subtype_xmlid="mail.mt_comment",
+        # 4. RESERVAS TEMPORALES DE OTROS ASESORES
+        records = records.filtered("fecha_fin")
+        holds = (
+            self.env["publicidad.reserva"]
+            .sudo()
+            ._search_conflicts(
+                [
+                    (rec.product_id.id, rec.fecha_inicio, rec.fecha_fin, rec.id)
+                    for rec in records
+                ]
+            )
+        )
+        if holds:
+            raise ValidationError(
+                _("Bloqueo de Agenda: Hay reservas temporales vigentes:\n%s")
+                % "\n".join(
+                    self._format_hold_conflict(hold)
+                    for idx in sorted(holds)
+                    for hold in holds[idx]
+                )
+            )
+
+    def _format_hold_conflict(self, hold):
+        return _(
+            "- %(product)s está reservado por %(user)s del %(start)s al %(end)s "
+            "hasta %(expires)s."
+        ) % {
+            "product": hold.product_id.display_name,
+            "user": hold.user_id.name or _("otro asesor"),
+            "start": hold.fecha_inicio.strftime("%d/%m/%Y"),
+            "end": hold.fecha_fin.strftime("%d/%m/%Y"),
+            "expires": tools.format_datetime(self.env, hold.expires_at),
+        }
+
+    def action_hold(self):
+        """Reserva temporalmente los activos mientras se negocia.
+
+        La reserva expira según ``hold_ttl_minutes`` y al confirmar la
+        suscripción se convierte en ocupación definitiva.
+        """
+        records = self.filtered(
+            lambda rec: rec.state in ("draft", "waiting_payment") and rec.fecha_fin
+        )
+        if not records:
+            return
+        records.product_id._lock_agenda()
+        slots = [
+            (rec.product_id.id, rec.fecha_inicio, rec.fecha_fin) for rec in records
+        ]
+        Reserva = self.env["publicidad.reserva"].sudo()
+        # Solo se muestran referencia y fechas de reservas de otros asesores
+        agenda = self.sudo()._search_agenda_conflicts(slots)
+        holds = Reserva._search_conflicts(
+            [slot + (rec.id,) for slot, rec in zip(slots, records)]
+        )
+        lines = []
+        for idx, rec in enumerate(records):
+            for other in agenda.get(idx, ()):
+                lines.append(
+                    _(
+                        "- %(product)s ya está asignado a %(ref)s del %(start)s al %(end)s."
+                    )
+                    % {
+                        "product": rec.product_id.display_name,
+                        "ref": other.name,
+                        "start": other.fecha_inicio.strftime("%d/%m/%Y"),
+                        "end": other.fecha_fin.strftime("%d/%m/%Y"),
+                    }
+                )
+            lines.extend(
+                self._format_hold_conflict(hold) for hold in holds.get(idx, Reserva)
+            )
+        if lines:
+            raise ValidationError(
+                _("No se pudo reservar el activo:\n%s") % "\n".join(lines)
+            )
+
+        Reserva.search([("suscripcion_id", "in", records.ids)]).unlink()
+        expires_at = fields.Datetime.now() + relativedelta(minutes=Reserva._get_ttl())
+        Reserva.create(
+            [
+                {
+                    "suscripcion_id": rec.id,
+                    "product_id": rec.product_id.id,
+                    "fecha_inicio": rec.fecha_inicio,
+                    "fecha_fin": rec.fecha_fin,
+                    "expires_at": expires_at,
+                    "user_id": self.env.user.id,
+                }
+                for rec in records
+            ]
+        )
+
+    def _get_agenda_conflicts(self):
+        """Detecta cruces de agenda para todo el recordset en una sola consulta.
+
+        Usa los valores en memoria del recordset, sin flush: la restricción
+        de exclusión es inmediata y un flush con cruces fallaría antes de
+        poder detallarlos. Compara contra las reservas guardadas y dentro del
+        propio lote. Retorna un dict {suscripción: suscripciones en conflicto}
+        con todos los cruces encontrados, no solo el primero.
+        """
+        records = self.filtered(
+            lambda r: (
+                r.state in AGENDA_STATES
+                and r.product_id
+                and r.fecha_inicio
+                and r.fecha_fin
+            )
+        )
+        if not records:
+            return {}
+
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT req.id, ARRAY_AGG(other.id ORDER BY other.fecha_inicio)
+                  FROM UNNEST(
+                           %(ids)s::int[], %(products)s::int[],
+                           %(starts)s::date[], %(ends)s::date[]
+                       ) AS req(id, product_id, fecha_inicio, fecha_fin)
+                  JOIN %(table)s other
+                    ON other.product_id = req.product_id
+                   AND other.id != ALL(%(excluded)s::int[])
+                   AND other.state IN %(states)s
+                   AND other.fecha_inicio <= req.fecha_fin
+                   AND other.fecha_fin >= req.fecha_inicio
+              GROUP BY req.id
+                """,
+                ids=records.ids,
+                products=[rec.product_id.id for rec in records],
+                starts=records.mapped("fecha_inicio"),
+                ends=records.mapped("fecha_fin"),
+                excluded=self.ids,
+                table=SQL.identifier(self._table),
+                states=AGENDA_STATES,
+            )
+        )
+        conflicts = {
+            self.browse(rec_id): self.browse(other_ids)
+            for rec_id, other_ids in self.env.cr.fetchall()
+        }
+
+        # Cruces entre registros del mismo lote
+        by_product = defaultdict(list)
+        for rec in records:
+            by_product[rec.product_id].append(rec)
+        for group in by_product.values():
+            for rec in group:
+                others = self.browse(
+                    [
+                        other.id
+                        for other in group
+                        if other != rec
+                        and other.fecha_inicio <= rec.fecha_fin
+                        and other.fecha_fin >= rec.fecha_inicio
+                    ]
+                )
+                if others:
+                    conflicts[rec] = conflicts.get(rec, self.browse()) | others
+        return conflicts
+
+    @api.model
+    def _search_agenda_conflicts(self, slots):
+        """Cruces de agenda para reservas aún no creadas, en una sola consulta.
+
+        ``slots`` es una lista de tuplas ``(product_id, fecha_inicio,
+        fecha_fin)``; retorna {índice del slot: suscripciones en conflicto}.
+        """
+        if not slots:
+            return {}
+        product_ids, starts, ends = zip(*slots)
+        self.flush_model(["product_id", "state", "fecha_inicio", "fecha_fin"])
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT req.idx, ARRAY_AGG(other.id ORDER BY other.fecha_inicio)
+                  FROM UNNEST(%(products)s::int[], %(starts)s::date[], %(ends)s::date[])
+                       WITH ORDINALITY AS req(product_id, fecha_inicio, fecha_fin, idx)
+                  JOIN %(table)s other
+                    ON other.product_id = req.product_id
+                   AND other.state IN %(states)s
+                   AND other.fecha_inicio <= req.fecha_fin
+                   AND other.fecha_fin >= req.fecha_inicio
+              GROUP BY req.idx
+                """,
+                products=list(product_ids),
+                starts=list(starts),
+                ends=list(ends),
+                table=SQL.identifier(self._table),
+                states=AGENDA_STATES,
+            )
+        )
+        return {
+            idx - 1: self.browse(other_ids) for idx, other_ids in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def get_availability(
+        self,
+        date_from,
+        date_to,
+        centro_comercial=None,
+        ubicacion_macro=None,
+        formato_id=None,
+    ):
+        """Disponibilidad del catálogo en una ventana de fechas.
+
+        Retorna, por activo, los intervalos reservados y libres dentro de la
+        ventana, resueltos con una única consulta agrupada.
+        """
+        self.check_access("read")
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        if not date_from or not date_to or date_from > date_to:
+            raise ValidationError(_("La ventana de fechas no es válida."))
+
+        products_query = self.env["product.product"]._search(
+            self._get_asset_domain(centro_comercial, ubicacion_macro, formato_id)
+        )
+
+        self.flush_model(["product_id", "state", "fecha_inicio", "fecha_fin"])
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT pp.id,
+                       ARRAY_AGG(s.id ORDER BY s.fecha_inicio)
+                           FILTER (WHERE s.id IS NOT NULL),
+                       ARRAY_AGG(s.fecha_inicio ORDER BY s.fecha_inicio)
+                           FILTER (WHERE s.id IS NOT NULL),
+                       ARRAY_AGG(s.fecha_fin ORDER BY s.fecha_inicio)
+                           FILTER (WHERE s.id IS NOT NULL)
+                  FROM product_product pp
+             LEFT JOIN %(table)s s
+                    ON s.product_id = pp.id
+                   AND s.state IN %(states)s
+                   AND s.fecha_inicio <= %(date_to)s
+                   AND s.fecha_fin >= %(date_from)s
+                 WHERE pp.id IN %(products)s
+              GROUP BY pp.id
+              ORDER BY pp.id
+                """,
+                table=SQL.identifier(self._table),
+                states=AGENDA_STATES,
+                date_from=date_from,
+                date_to=date_to,
+                products=products_query.subselect(),
+            )
+        )
+        rows = self.env.cr.fetchall()
+
+        products = self.env["product.product"].browse([row[0] for row in rows])
+        result = []
+        for product, (_pid, sub_ids, starts, ends) in zip(products, rows):
+            booked = [
+                {
+                    "suscripcion_id": sub_id,
+                    "start": fields.Date.to_string(max(start, date_from)),
+                    "end": fields.Date.to_string(min(end, date_to)),
+                }
+                for sub_id, start, end in zip(sub_ids or [], starts or [], ends or [])
+            ]
+            result.append(
+                {
+                    "product_id": product.id,
+                    "name": product.display_name,
+                    "centro_comercial": product.centro_comercial or False,
+                    "booked": booked,
+                    "free": self._free_intervals(
+                        zip(starts or [], ends or []), date_from, date_to
+                    ),
+                }
+            )
+        return result
+
+    @api.model
+    def _free_intervals(self, booked, date_from, date_to):
+        """Huecos libres (inclusivos) entre intervalos reservados ordenados"""
+        free = []
+        cursor = date_from
+        for start, end in booked:
+            if start > cursor:
+                free.append((cursor, start - relativedelta(days=1)))
+            cursor = max(cursor, end + relativedelta(days=1))
+        if cursor <= date_to:
+            free.append((cursor, date_to))
+        return [
+            {"start": fields.Date.to_string(start), "end": fields.Date.to_string(end)}
+            for start, end in free
+        ]
+
+    @api.model
+    def _get_asset_domain(
+        self, centro_comercial=None, ubicacion_macro=None, formato_id=None
+    ):
+        domain = []
+        if centro_comercial:
+            domain.append(("centro_comercial", "=", centro_comercial))
+        if ubicacion_macro:
+            domain.append(("ubicacion_macro", "=", ubicacion_macro))
+        if formato_id:
+            domain.append(("formato_id", "=", formato_id))
+        return domain
+
+    @api.model
+    def get_timeline(
+        self,
+        date_from,
+        date_to,
+        centro_comercial=None,
+        offset=0,
+        limit=TIMELINE_PAGE_SIZE,
+        loaded_from=None,
+        loaded_to=None,
+    ):
+        """Reservas por activo para una ventana de la línea de tiempo.
+
+        Pagina por activo (``offset``/``limit``) y devuelve solo los campos
+        que dibuja el timeline. Al desplazarse, ``loaded_from``/``loaded_to``
+        indican la ventana ya cargada y se omiten las reservas que la tocan.
+        Las reservas que las reglas de registro no dejan leer se muestran
+        como ocupación, sin referencia ni cliente.
+        """
+        self.check_access("read")
+        date_from = fields.Date.to_date(date_from)
+        date_to = fields.Date.to_date(date_to)
+        if not date_from or not date_to or date_from > date_to:
+            raise ValidationError(_("La ventana de fechas no es válida."))
+        loaded_from = fields.Date.to_date(loaded_from)
+        loaded_to = fields.Date.to_date(loaded_to)
+
+        Product = self.env["product.product"]
+        domain = self._get_asset_domain(centro_comercial)
+        total = Product.search_count(domain)
+        products = Product.search(domain, offset=offset, limit=limit, order="id")
+        if not products:
+            return {"assets": [], "total": total, "offset": None}
+
+        skip_loaded = SQL()
+        if loaded_from and loaded_to:
+            skip_loaded = SQL(
+                "AND NOT (s.fecha_inicio <= %s AND s.fecha_fin >= %s)",
+                loaded_to,
+                loaded_from,
+            )
+        self.flush_model(
+            ["name", "partner_id", "product_id", "state", "fecha_inicio", "fecha_fin"]
+        )
+        # Subconsulta con las reglas de registro del usuario aplicadas
+        readable = self._search([("product_id", "in", products.ids)])
+        self.env.cr.execute(
+            SQL(
+                """
+                SELECT s.product_id, s.id, s.name, s.state,
+                       s.fecha_inicio, s.fecha_fin, p.name,
+                       s.id IN %(readable)s
+                  FROM %(table)s s
+                  JOIN res_partner p ON p.id = s.partner_id
+                 WHERE s.product_id IN %(products)s
+                   AND s.state IN %(states)s
+                   AND s.fecha_inicio <= %(date_to)s
+                   AND s.fecha_fin >= %(date_from)s
+                   %(skip_loaded)s
+              ORDER BY s.product_id, s.fecha_inicio
+                """,
+                table=SQL.identifier(self._table),
+                readable=readable.subselect(),
+                products=tuple(products.ids),
+                states=TIMELINE_STATES,
+                date_from=date_from,
+                date_to=date_to,
+                skip_loaded=skip_loaded,
+            )
+        )
+        bookings = defaultdict(list)
+        for (
+            product_id,
+            sub_id,
+            name,
+            state,
+            start,
+            end,
+            partner,
+            is_readable,
+        ) in self.env.cr.fetchall():
+            bookings[product_id].append(
+                {
+                    "id": sub_id if is_readable else False,
+                    "name": name if is_readable else _("Reservado"),
+                    "partner": partner if is_readable else False,
+                    "state": state,
+                    "start": fields.Date.to_string(start),
+                    "end": fields.Date.to_string(end),
+                }
             )
 
+        next_offset = offset + len(products)
+        return {
+            "assets": [
+                {
+                    "product_id": product.id,
+                    "name": product.display_name,
+                    "centro_comercial": product.centro_comercial or False,
+                    "bookings": bookings[product.id],
+                }
+                for product in products
+            ],
+            "total": total,
+            "offset": next_offset if next_offset < total else None,
+        }
+
+    # --- TARIFARIO ---
+
+    @api.model
+    def _iter_rate_card(self, products, fecha=None, batch_size=RECOMPUTE_BATCH_SIZE):
+        """Precios de toda la grilla activo × centro × ubicación × contenido × duración.
+
+        Usa el mismo motor que ``_compute_precio_mensual`` sin crear registros:
+        por cada lote de activos se leen ``lst_price`` y la matriz de extras,
+        y los precios se obtienen sumando vectores de recargos precalculados.
+        Genera tuplas ``(producto, centro, ubicacion, contenido, duracion,
+        precio_mensual, valor_total)``.
+        """
+        fecha = fecha or fields.Date.context_today(self)
+        tarifa_model = self.env["publicidad.tarifa.centro"]
+        tarifas = tarifa_model._get_current_tarifas()
+        centros = [
+            (key, tarifa_model._get_recargo(key, fecha, tarifas))
+            for key, _label in self._fields["centro_comercial"].selection
+        ]
+        ubicaciones = [key for key, _label in self._fields["ubicacion_macro"].selection]
+        contenidos = [key for key, _label in self._fields["tipo_contenido"].selection]
+        duraciones = [
+            (key, int(key)) for key, _label in self._fields["duracion_meses"].selection
+        ]
+
+        for offset in range(0, len(products), batch_size):
+            batch = products[offset : offset + batch_size]
+            # Prefetch en lote de precios y atributos
+            batch.mapped("lst_price")
+            batch.product_template_attribute_value_ids.mapped(
+                "product_attribute_value_id.publicidad_codigo"
+            )
+            batch.product_template_attribute_value_ids.mapped(
+                "attribute_id.publicidad_campo"
+            )
+            for product in batch:
+                matrix = self._get_pricing_matrix(product.id)
+                extras_ubicacion = [
+                    (key, matrix["ubicacion"].get(key, 0.0)) for key in ubicaciones
+                ]
+                extras_contenido = [
+                    (key, matrix["video"] if key == "video" else 0.0)
+                    for key in contenidos
+                ]
+                base = product.lst_price
+                for centro, recargo in centros:
+                    for ubicacion, extra_ubicacion in extras_ubicacion:
+                        for contenido, extra_contenido in extras_contenido:
+                            precio = base + recargo + extra_ubicacion + extra_contenido
+                            for duracion, months in duraciones:
+                                yield (
+                                    product,
+                                    centro,
+                                    ubicacion,
+                                    contenido,
+                                    duracion,
+                                    precio,
+                                    precio * months,
+                                )
+
+    @profiled()
+    def action_request_approval(self):
+        """Solicita aprobación de finanzas y notifica"""
+        self.write({"state": "waiting_payment"})
+        self._generate_cuotas()
+        # Notificación en el chatter (diferida, por lotes)
+        self.env["publicidad.notificacion"]._enqueue(
+            self,
+            _(
+                "Solicitud de Aprobación: El Asesor ha enviado esta suscripción para validación de pago."
+            ),
+            message_type="comment",
+            subtype_xmlid="mail.mt_comment",
+        )
+
+    @profiled()
     def action_confirm(self):
         """Confirma la suscripción (Normalmente por Finanzas)"""
-        for rec in self:
-            rec.state = "confirmed"
-            rec.message_post(
-                body=_("Suscripción Confirmada: El pago ha sido validado.")
-            )
+        self.write({"state": "confirmed"})
+        self.env["publicidad.notificacion"]._enqueue(
+            self, _("Suscripción Confirmada: El pago ha sido validado.")
+        )
 
+    @profiled()
     def action_active(self):
         """Activa la suscripción con validaciones estrictas"""
         for rec in self:
@@ -650,6 +1790,9 @@ class PublicidadSuscripcion(models.Model):
 
     def action_cancel(self):
         self.write({"state": "cancel"})
+        self.env["publicidad.cuota"].sudo().search(
+            [("suscripcion_id", "in", self.ids), ("state", "=", "pending")]
+        ).write({"state": "cancel"})
 
     def action_draft(self):
         self.write({"state": "draft"})
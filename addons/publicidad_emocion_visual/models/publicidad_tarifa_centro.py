@@ -0,0 +1,142 @@
+from odoo import api, fields, models, tools, _
+from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+
+
+class PublicidadTarifaCentro(models.Model):
+    _name = "publicidad.tarifa.centro"
+    _description = "Tarifa de prestigio por centro comercial"
+    _order = "centro_comercial, fecha_desde desc"
+
+    centro_comercial = fields.Selection(
+        selection=[
+            ("viva", "Viva"),
+            ("buenavista", "Buenavista"),
+            ("mallplaza", "Mallplaza"),
+            ("unico", "Unico"),
+            ("plaza_central", "Plaza Central"),
+        ],
+        string="Centro Comercial",
+        required=True,
+    )
+    recargo = fields.Monetary(
+        string="Recargo Mensual",
+        currency_field="currency_id",
+        help="Plus mensual por prestigio del centro comercial",
+    )
+    currency_id = fields.Many2one(
+        "res.currency",
+        default=lambda self: self.env.company.currency_id,
+        readonly=True,
+    )
+    fecha_desde = fields.Date(
+        string="Vigente desde",
+        required=True,
+        default=fields.Date.context_today,
+    )
+    fecha_hasta = fields.Date(
+        string="Vigente hasta",
+        help="Dejar vacío para una tarifa sin fecha de fin",
+    )
+    active = fields.Boolean(default=True)
+
+    @api.constrains("centro_comercial", "fecha_desde", "fecha_hasta", "active")
+    def _check_vigencia(self):
+        """Evita tarifas superpuestas para un mismo centro"""
+        for rec in self:
+            if rec.fecha_hasta and rec.fecha_hasta < rec.fecha_desde:
+                raise ValidationError(
+                    _("La fecha de fin de la tarifa debe ser posterior al inicio.")
+                )
+            domain = [
+                ("id", "!=", rec.id),
+                ("centro_comercial", "=", rec.centro_comercial),
+                "|",
+                ("fecha_hasta", "=", False),
+                ("fecha_hasta", ">=", rec.fecha_desde),
+            ]
+            if rec.fecha_hasta:
+                domain.append(("fecha_desde", "<=", rec.fecha_hasta))
+            if self.search_count(domain, limit=1):
+                raise ValidationError(
+                    _("Ya existe una tarifa vigente para %(centro)s en ese periodo.")
+                    % {
+                        "centro": dict(self._fields["centro_comercial"].selection)[
+                            rec.centro_comercial
+                        ]
+                    }
+                )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records._enqueue_recompute(set(records.mapped("centro_comercial")))
+        return records
+
+    def write(self, vals):
+        centros = set(self.mapped("centro_comercial"))
+        res = super().write(vals)
+        self._enqueue_recompute(centros | set(self.mapped("centro_comercial")))
+        return res
+
+    def unlink(self):
+        centros = set(self.mapped("centro_comercial"))
+        res = super().unlink()
+        self._enqueue_recompute(centros)
+        return res
+
+    def _enqueue_recompute(self, centros):
+        """Programa el recálculo por lotes de los borradores afectados"""
+        if not centros:
+            return
+        self.env["publicidad.suscripcion"]._mark_precio_pendiente(centros)
+        self.env.ref("publicidad_emocion_visual.ir_cron_recompute_precios")._trigger()
+
+    # --- CACHE DE TARIFAS ---
+
+    @api.model
+    def _get_recargo(self, centro_comercial, fecha, tarifas=None):
+        """Recargo vigente del centro en la fecha dada (0.0 si no hay tarifa)"""
+        if not centro_comercial:
+            return 0.0
+        if tarifas is None:
+            tarifas = self._get_current_tarifas()
+        fecha = fecha or fields.Date.context_today(self)
+        for centro, desde, hasta, recargo in tarifas:
+            if (
+                centro == centro_comercial
+                and desde <= fecha
+                and (not hasta or fecha <= hasta)
+            ):
+                return recargo
+        return 0.0
+
+    @api.model
+    def _get_current_tarifas(self):
+        """Tabla de tarifas activas desde la cache de proceso"""
+        return self._get_tarifa_table(self._get_tarifa_stamp())
+
+    @api.model
+    def _get_tarifa_stamp(self):
+        """Huella de la tabla de tarifas (último write_date y cantidad)"""
+        self.flush_model()
+        self.env.cr.execute(
+            SQL(
+                "SELECT MAX(write_date), COUNT(*) FROM %s",
+                SQL.identifier(self._table),
+            )
+        )
+        return tuple(self.env.cr.fetchone())
+
+    @tools.ormcache("stamp")
+    def _get_tarifa_table(self, stamp):
+        """Tarifas activas cacheadas a nivel de proceso por huella"""
+        return tuple(
+            (
+                tarifa.centro_comercial,
+                tarifa.fecha_desde,
+                tarifa.fecha_hasta,
+                tarifa.recargo,
+            )
+            for tarifa in self.sudo().search([])
+        )
@@ -0,0 +1,89 @@
+"""Sondas de rendimiento opcionales para las rutas críticas del módulo.
+
+Se activan con el parámetro de sistema ``publicidad_emocion_visual.perf_sample_rate``
+(0 = apagado, 1 = todas las llamadas) y registran duración, número de
+consultas SQL y cantidad de registros. Con
+``publicidad_emocion_visual.perf_sink = model`` también se guardan en
+``publicidad.perf.log``; por defecto solo se escriben en el log.
+"""
+
+import functools
+import logging
+import random
+import time
+from contextlib import contextmanager
+
+from odoo import SUPERUSER_ID, api
+from odoo.models import BaseModel
+
+_logger = logging.getLogger(__name__)
+
+SAMPLE_RATE_PARAM = "publicidad_emocion_visual.perf_sample_rate"
+SINK_PARAM = "publicidad_emocion_visual.perf_sink"
+
+
+def _sample_rate(env):
+    try:
+        return float(env["ir.config_parameter"].sudo().get_param(SAMPLE_RATE_PARAM, 0))
+    except ValueError:
+        return 0.0
+
+
+@contextmanager
+def perf_probe(env, name, records=None):
+    """Mide el bloque si cae dentro de la tasa de muestreo.
+
+    Entrega un dict cuyo ``records`` el bloque puede reemplazar cuando los
+    registros solo se conocen al final (p. ej. los creados por ``create``).
+    """
+    probe = {"records": records}
+    rate = _sample_rate(env)
+    if rate <= 0 or random.random() >= rate:
+        yield probe
+        return
+
+    queries = env.cr.sql_log_count
+    start = time.perf_counter()
+    try:
+        yield probe
+    finally:
+        records = probe["records"]
+        vals = {
+            "name": name,
+            "duration_ms": (time.perf_counter() - start) * 1000.0,
+            "query_count": env.cr.sql_log_count - queries,
+            "record_count": len(records) if records is not None else 0,
+            "user_id": env.uid,
+        }
+        _logger.info(
+            "publicidad.perf name=%(name)s duration_ms=%(duration_ms).1f "
+            "queries=%(query_count)s records=%(record_count)s uid=%(user_id)s",
+            vals,
+        )
+        if env["ir.config_parameter"].sudo().get_param(SINK_PARAM) == "model":
+            _store(env, vals)
+
+
+def _store(env, vals):
+    # Cursor propio: se conserva aunque la transacción falle
+    with env.registry.cursor() as cr:
+        api.Environment(cr, SUPERUSER_ID, {})["publicidad.perf.log"].create(vals)
+
+
+def profiled(name=None):
+    """Decorador de métodos de modelo que aplica ``perf_probe``"""
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            probe_name = name or f"{self._name}.{method.__name__}"
+            with perf_probe(self.env, probe_name, self) as probe:
+                result = method(self, *args, **kwargs)
+                # Métodos de modelo (create): cuenta los registros retornados
+                if not self and isinstance(result, BaseModel):
+                    probe["records"] = result
+                return result
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1 @@
+from . import publicidad_ocupacion_report
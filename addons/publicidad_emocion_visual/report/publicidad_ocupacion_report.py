@@ -0,0 +1,169 @@
+from odoo import api, fields, models
+from odoo.tools import SQL
+
+from ..models.publicidad_suscripcion import REPORT_STATES
+
+# Clave de precommit con activos por refrescar
+REFRESH_KEY = "publicidad.ocupacion.report.refresh"
+
+
+class PublicidadOcupacionReport(models.Model):
+    _name = "publicidad.ocupacion.report"
+    _description = "Reporte de ocupación y facturación por activo"
+    _auto = False
+    _order = "month desc, product_id"
+    _rec_name = "product_id"
+
+    product_id = fields.Many2one(
+        comodel_name="product.product",
+        string="Activo Publicitario",
+        readonly=True,
+    )
+    centro_comercial = fields.Selection(
+        selection=[
+            ("viva", "Viva"),
+            ("buenavista", "Buenavista"),
+            ("mallplaza", "Mallplaza"),
+            ("unico", "Unico"),
+            ("plaza_central", "Plaza Central"),
+        ],
+        string="Centro Comercial",
+        readonly=True,
+    )
+    ubicacion_macro = fields.Selection(
+        selection=[
+            ("fachada", "Fachada"),
+            ("entrada", "Entrada"),
+            ("pasillo", "Pasillo"),
+            ("plazoleta", "Plazoleta de Comidas"),
+        ],
+        string="Ubicación Macro",
+        readonly=True,
+    )
+    month = fields.Date(string="Mes", readonly=True)
+    booked_days = fields.Integer(string="Días Reservados", readonly=True)
+    days_in_month = fields.Integer(string="Días del Mes", readonly=True)
+    occupancy = fields.Float(
+        string="Ocupación (%)",
+        readonly=True,
+        aggregator="avg",
+    )
+    revenue = fields.Float(
+        string="Ingresos",
+        readonly=True,
+        help="Precio mensual prorrateado por los días reservados del mes",
+    )
+    suscripcion_count = fields.Integer(string="Suscripciones", readonly=True)
+
+    def init(self):
+        """Tabla materializada: una fila por activo y mes con reservas.
+
+        Se crea vacía: al inicializar este modelo las tablas de origen pueden
+        no existir aún. La carga inicial la hacen ``post_init_hook`` y la
+        migración 18.0.1.1.0.
+        """
+        self.env.cr.execute(
+            SQL(
+                """
+                CREATE TABLE IF NOT EXISTS %(table)s (
+                    id SERIAL PRIMARY KEY,
+                    product_id INTEGER NOT NULL,
+                    centro_comercial VARCHAR,
+                    ubicacion_macro VARCHAR,
+                    month DATE NOT NULL,
+                    booked_days INTEGER,
+                    days_in_month INTEGER,
+                    occupancy DOUBLE PRECISION,
+                    revenue DOUBLE PRECISION,
+                    suscripcion_count INTEGER
+                );
+                CREATE INDEX IF NOT EXISTS %(month_idx)s ON %(table)s (month);
+                CREATE INDEX IF NOT EXISTS %(product_idx)s
+                    ON %(table)s (product_id, month);
+                """,
+                table=SQL.identifier(self._table),
+                month_idx=SQL.identifier(f"{self._table}_month_idx"),
+                product_idx=SQL.identifier(f"{self._table}_product_month_idx"),
+            )
+        )
+
+    @api.model
+    def _refresh(self, product_ids=None):
+        """Recalcula las filas de los activos dados (todos si es None)"""
+        self.env["publicidad.suscripcion"].flush_model()
+        if product_ids is None:
+            where = sub_where = SQL("TRUE")
+        elif not product_ids:
+            return
+        else:
+            where = SQL("product_id IN %s", tuple(product_ids))
+            sub_where = SQL("s.product_id IN %s", tuple(product_ids))
+
+        self.env.cr.execute(
+            SQL(
+                """
+                DELETE FROM %(table)s WHERE %(where)s;
+                INSERT INTO %(table)s (
+                    product_id, centro_comercial, ubicacion_macro, month,
+                    booked_days, days_in_month, occupancy, revenue,
+                    suscripcion_count
+                )
+                SELECT product_id,
+                       MIN(centro_comercial),
+                       MIN(ubicacion_macro),
+                       month,
+                       LEAST(SUM(days), MAX(days_in_month)),
+                       MAX(days_in_month),
+                       100.0 * LEAST(SUM(days), MAX(days_in_month))
+                           / MAX(days_in_month),
+                       SUM(precio_mensual * days / days_in_month),
+                       COUNT(*)
+                  FROM (
+                        SELECT s.product_id,
+                               COALESCE(pt.centro_comercial, s.centro_comercial)
+                                   AS centro_comercial,
+                               COALESCE(pt.ubicacion_macro, s.ubicacion_macro)
+                                   AS ubicacion_macro,
+                               m.month::date AS month,
+                               COALESCE(s.precio_mensual, 0) AS precio_mensual,
+                               LEAST(s.fecha_fin, (m.month + INTERVAL '1 month - 1 day')::date)
+                                   - GREATEST(s.fecha_inicio, m.month::date) + 1
+                                   AS days,
+                               ((m.month + INTERVAL '1 month')::date - m.month::date)
+                                   AS days_in_month
+                          FROM %(sub_table)s s
+                          JOIN product_product pp ON pp.id = s.product_id
+                          JOIN product_template pt ON pt.id = pp.product_tmpl_id
+                    CROSS JOIN LATERAL generate_series(
+                               date_trunc('month', s.fecha_inicio),
+                               date_trunc('month', s.fecha_fin),
+                               INTERVAL '1 month'
+                           ) AS m(month)
+                         WHERE s.state IN %(states)s
+                           AND s.fecha_inicio IS NOT NULL
+                           AND s.fecha_fin IS NOT NULL
+                           AND %(sub_where)s
+                       ) AS booking
+              GROUP BY product_id, month
+                """,
+                table=SQL.identifier(self._table),
+                sub_table=SQL.identifier(self.env["publicidad.suscripcion"]._table),
+                states=REPORT_STATES,
+                where=where,
+                sub_where=sub_where,
+            )
+        )
+        self.invalidate_model()
+
+    @api.model
+    def _enqueue_refresh(self, product_ids):
+        """Acumula activos y refresca una sola vez antes del commit"""
+        pending = self.env.cr.precommit.data.get(REFRESH_KEY)
+        if pending is None:
+            pending = self.env.cr.precommit.data[REFRESH_KEY] = set()
+            self.env.cr.precommit.add(self._flush_refresh)
+        pending.update(product_ids)
+
+    @api.model
+    def _flush_refresh(self):
+        self._refresh(self.env.cr.precommit.data.pop(REFRESH_KEY, set()))
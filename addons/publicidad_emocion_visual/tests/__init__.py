@@ -0,0 +1,3 @@
+from . import test_performance
+from . import test_publicidad
+from . import test_import_wizard
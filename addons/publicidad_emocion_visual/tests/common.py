@@ -0,0 +1,199 @@
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+from dateutil.relativedelta import relativedelta
+from odoo import Command, fields
+from odoo.models import PREFETCH_MAX
+from odoo.tests.common import TransactionCase
+
+_logger = logging.getLogger(__name__)
+
+# Crecimiento máximo de consultas al multiplicar x10 el tamaño del lote
+MAX_QUERY_GROWTH = 3
+
+# Consultas máximas de un create() de 1.000 suscripciones (incluye el flush)
+CREATE_1000_QUERY_BUDGET = 150
+
+# Consultas máximas por operación hasta PREFETCH_MAX registros (incluye el flush).
+# Por encima de PREFETCH_MAX la lectura se parte en bloques y solo se aplica
+# la cota de crecimiento.
+QUERY_BUDGETS = {
+    "create": CREATE_1000_QUERY_BUDGET,
+    "confirm": 120,
+    "price_recompute": 60,
+    "technical_specs": 30,
+    "list_search_read": 30,
+    "timeline": 30,
+    "generate_cuotas": 60,
+    "notifications": 60,
+}
+
+# Crecimiento máximo del tiempo al multiplicar x10 el tamaño del lote
+MAX_TIME_GROWTH = 15
+
+# Tiempo mínimo (s) considerado al comparar: por debajo domina el ruido
+MIN_TIMED = 0.05
+
+# Tiempo máximo (s) por registro de cualquier operación medida
+MAX_TIME_PER_RECORD = 0.02
+
+# Consulta de disponibilidad: activos, meses de ventana y tiempo máximo (s)
+AVAILABILITY_ASSETS = 2000
+AVAILABILITY_MONTHS = 24
+AVAILABILITY_MAX_TIME = 0.2
+
+
+class PublicidadCase(TransactionCase):
+    """Base de pruebas: clientes, atributos y catálogos sintéticos"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.partners = cls.env["res.partner"].create(
+            [{"name": f"Cliente Benchmark {i}"} for i in range(10)]
+        )
+        Attribute = cls.env["product.attribute"]
+        cls.attr_ubicacion = Attribute.create(
+            {
+                "name": "Ubicación",
+                "value_ids": [
+                    Command.create({"name": "Fachada", "default_extra_price": 200.0}),
+                    Command.create({"name": "Pasillo", "default_extra_price": 100.0}),
+                ],
+            }
+        )
+        cls.attr_contenido = Attribute.create(
+            {
+                "name": "Tipo de Contenido",
+                "value_ids": [
+                    Command.create({"name": "Video", "default_extra_price": 300.0}),
+                ],
+            }
+        )
+        cls.attr_formato = Attribute.create(
+            {
+                "name": "Formato",
+                "value_ids": [Command.create({"name": "Pantalla LED"})],
+            }
+        )
+
+    def _seed_catalog(self, size):
+        """Crea ``size`` activos con atributos de ubicación, contenido y formato"""
+        templates = self.env["product.template"].create(
+            [
+                {
+                    "name": f"Pantalla {size}-{i}",
+                    "list_price": 1000.0,
+                    "centro_comercial": "viva",
+                    "ubicacion_macro": "fachada",
+                    "attribute_line_ids": [
+                        Command.create(
+                            {
+                                "attribute_id": attribute.id,
+                                "value_ids": [Command.set(attribute.value_ids[:1].ids)],
+                            }
+                        )
+                        for attribute in (
+                            self.attr_ubicacion,
+                            self.attr_contenido,
+                            self.attr_formato,
+                        )
+                    ],
+                }
+                for i in range(size)
+            ]
+        )
+        return templates.product_variant_ids
+
+    def _add_stock(self, products):
+        """Una unidad en bodega por activo para pasar la validación de stock"""
+        location = self.env.ref("stock.stock_location_stock")
+        products.product_tmpl_id.write({"is_storable": True})
+        for product in products:
+            self.env["stock.quant"]._update_available_quantity(product, location, 1)
+
+    def _prepare_suscripciones(self, products):
+        """Valores de suscripción sin cruces de agenda, una por activo"""
+        start = fields.Date.today() + relativedelta(days=1)
+        return [
+            {
+                "partner_id": self.partners[i % len(self.partners)].id,
+                "product_id": product.id,
+                "centro_comercial": "viva",
+                "ubicacion_macro": "fachada",
+                "tipo_contenido": "video" if i % 2 else "estatico",
+                "duracion_meses": "3",
+                "fecha_inicio": start,
+            }
+            for i, product in enumerate(products)
+        ]
+
+    def _seed_suscripciones(self, size):
+        products = self._seed_catalog(size)
+        return self.env["publicidad.suscripcion"].create(
+            self._prepare_suscripciones(products)
+        )
+
+    def _add_stock_if_installed(self, products):
+        # Sin inventario la validación de stock físico se omite
+        if "stock.quant" in self.env:
+            self._add_stock(products)
+
+
+class PublicidadBenchmarkCase(PublicidadCase):
+    """Base de benchmarks: medición de consultas y tiempo de pared"""
+
+    @contextmanager
+    def _benchmark(self, label, size):
+        """Mide consultas SQL y tiempo de pared del bloque.
+
+        Hasta PREFETCH_MAX registros el bloque además debe respetar el
+        presupuesto de consultas de ``QUERY_BUDGETS``.
+        """
+        self.env.flush_all()
+        self.env.invalidate_all()
+        budget = QUERY_BUDGETS.get(label) if size <= PREFETCH_MAX else None
+        result = {}
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        with self.assertQueryCount(budget) if budget else nullcontext():
+            yield result
+            self.env.flush_all()
+        result["queries"] = self.env.cr.sql_log_count - queries
+        result["time"] = time.perf_counter() - start
+        _logger.info(
+            "publicidad.benchmark %s size=%s queries=%s time=%.3fs",
+            label,
+            size,
+            result["queries"],
+            result["time"],
+        )
+
+    def _assert_scales(self, label, prepare, run, sizes):
+        """Mide ``run(prepare(size))`` por tamaño y falla si crece por registro"""
+        results = []
+        for size in sizes:
+            data = prepare(size)
+            with self._benchmark(label, size) as result:
+                run(data)
+            self.assertLessEqual(
+                result["time"],
+                size * MAX_TIME_PER_RECORD,
+                f"{label}: {result['time']:.3f}s para {size} registros",
+            )
+            results.append(result)
+        for small, large in zip(results, results[1:]):
+            self.assertLessEqual(
+                large["queries"],
+                small["queries"] * MAX_QUERY_GROWTH,
+                f"{label}: el número de consultas crece con el tamaño del lote "
+                f"({small['queries']} -> {large['queries']})",
+            )
+            self.assertLessEqual(
+                large["time"],
+                max(small["time"], MIN_TIMED) * MAX_TIME_GROWTH,
+                f"{label}: el tiempo crece más que el tamaño del lote "
+                f"({small['time']:.3f}s -> {large['time']:.3f}s)",
+            )
+        return results
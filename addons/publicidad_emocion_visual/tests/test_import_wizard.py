@@ -0,0 +1,146 @@
+import base64
+import csv
+import io
+
+from dateutil.relativedelta import relativedelta
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import PublicidadCase
+
+HEADERS = [
+    "referencia",
+    "cliente",
+    "activo",
+    "fecha_inicio",
+    "duracion_meses",
+    "centro_comercial",
+    "ubicacion_macro",
+    "estado",
+]
+
+
+@tagged("post_install", "-at_install")
+class TestPublicidadImportWizard(PublicidadCase):
+    """Importación de suscripciones heredadas desde CSV"""
+
+    def setUp(self):
+        super().setUp()
+        self.Suscripcion = self.env["publicidad.suscripcion"]
+        self.products = self._seed_catalog(4)
+        self._add_stock_if_installed(self.products)
+        self.start = fields.Date.today() + relativedelta(days=1)
+
+    def _row(self, ref, product, start=None, state="confirmed", cliente=None):
+        return [
+            ref,
+            cliente or self.partners[0].name,
+            product.name,
+            fields.Date.to_string(start or self.start),
+            "3",
+            "viva",
+            "fachada",
+            state,
+        ]
+
+    def _import(self, rows, **vals):
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(HEADERS)
+        writer.writerows(rows)
+        wizard = self.env["publicidad.import.wizard"].create(
+            {
+                "data_file": base64.b64encode(output.getvalue().encode()),
+                "filename": "legado.csv",
+                **vals,
+            }
+        )
+        wizard.action_import()
+        return wizard
+
+    def _imported(self, *refs):
+        """Referencias del archivo que llegaron a la base de datos"""
+        return sorted(
+            self.Suscripcion.search([("name", "in", list(refs))]).mapped("name")
+        )
+
+    def _error(self, wizard, row_number):
+        return wizard.error_ids.filtered(lambda e: e.row_number == row_number)
+
+    def test_overlap_in_file(self):
+        product = self.products[0]
+        wizard = self._import(
+            [
+                self._row("LEG-1", product),
+                self._row("LEG-2", product, self.start + relativedelta(months=1)),
+                self._row("LEG-3", self.products[1]),
+            ]
+        )
+        self.assertEqual(wizard.imported_count, 2)
+        self.assertEqual(self._imported("LEG-1", "LEG-2", "LEG-3"), ["LEG-1", "LEG-3"])
+        self.assertIn("fila 2", self._error(wizard, 3).message)
+
+    def test_overlap_existing_agenda(self):
+        product = self.products[0]
+        existing = self.Suscripcion.create(self._prepare_suscripciones(product))
+        existing.write({"state": "confirmed"})
+        wizard = self._import(
+            [
+                self._row("LEG-1", product, self.start + relativedelta(months=1)),
+                # Los borradores no ocupan la agenda
+                self._row("LEG-2", product, state="draft"),
+            ]
+        )
+        self.assertEqual(wizard.imported_count, 1)
+        self.assertIn(existing.name, self._error(wizard, 2).message)
+        self.assertTrue(self._imported("LEG-2"))
+
+    def test_chunk_fallback(self):
+        # La reserva temporal no se valida antes de escribir: falla el lote
+        held = self.products[1]
+        self.Suscripcion.create(self._prepare_suscripciones(held)).action_hold()
+        wizard = self._import(
+            [
+                self._row("LEG-1", self.products[0]),
+                self._row("LEG-2", held),
+                self._row("LEG-3", self.products[2]),
+            ]
+        )
+        self.assertEqual(wizard.imported_count, 2)
+        self.assertEqual(
+            self._imported("LEG-1", "LEG-2", "LEG-3"),
+            ["LEG-1", "LEG-3"],
+        )
+        self.assertEqual(wizard.error_ids.mapped("row_number"), [3])
+        self.assertIn("reservas temporales", self._error(wizard, 3).message)
+
+    def test_resume(self):
+        rows = [
+            self._row(f"LEG-{i}", product, state="draft")
+            for i, product in enumerate(self.products, start=1)
+        ]
+        wizard = self._import(rows, resume_row=3, chunk_size=1)
+        self.assertEqual(wizard.imported_count, 2)
+        self.assertEqual(
+            self._imported("LEG-1", "LEG-2", "LEG-3", "LEG-4"),
+            ["LEG-3", "LEG-4"],
+        )
+        self.assertEqual(wizard.resume_row, 5)
+
+    def test_error_report(self):
+        rejected = self._row(
+            "LEG-2", self.products[1], state="draft", cliente="Cliente Inexistente"
+        )
+        wizard = self._import(
+            [self._row("LEG-1", self.products[0], state="draft"), rejected]
+        )
+        self.assertEqual(wizard.imported_count, 1)
+        self.assertEqual(wizard.error_filename, "errores_legado.csv")
+        report = list(
+            csv.reader(io.StringIO(base64.b64decode(wizard.error_file).decode()))
+        )
+        self.assertEqual(report[0], ["fila", "error", *HEADERS])
+        self.assertEqual(len(report), 2)
+        self.assertEqual(report[1][0], "3")
+        self.assertIn("Cliente Inexistente", report[1][1])
+        self.assertEqual(report[1][2:], rejected)
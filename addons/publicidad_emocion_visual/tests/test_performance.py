@@ -0,0 +1,187 @@
+from dateutil.relativedelta import relativedelta
+from odoo import fields
+from odoo.tests import tagged
+
+from .common import (
+    AVAILABILITY_ASSETS,
+    AVAILABILITY_MAX_TIME,
+    AVAILABILITY_MONTHS,
+    CREATE_1000_QUERY_BUDGET,
+    PublicidadBenchmarkCase,
+)
+
+
+@tagged("post_install", "-at_install", "publicidad_benchmark")
+class TestPublicidadPerformance(PublicidadBenchmarkCase):
+    """Consultas SQL de las rutas críticas a 100 y 1.000 registros"""
+
+    sizes = (100, 1000)
+
+    def test_create(self):
+        Suscripcion = self.env["publicidad.suscripcion"]
+        self._assert_scales(
+            "create",
+            lambda size: self._prepare_suscripciones(self._seed_catalog(size)),
+            Suscripcion.create,
+            self.sizes,
+        )
+
+    def test_confirm(self):
+        def prepare(size):
+            records = self._seed_suscripciones(size)
+            self._add_stock_if_installed(records.product_id)
+            records.write({"state": "waiting_payment"})
+            return records
+
+        def run(records):
+            records.action_confirm()
+
+        self._assert_scales("confirm", prepare, run, self.sizes)
+
+    def test_price_recompute(self):
+        def run(records):
+            self.env.add_to_compute(records._fields["precio_mensual"], records)
+            records.flush_recordset()
+
+        self._assert_scales(
+            "price_recompute", self._seed_suscripciones, run, self.sizes
+        )
+
+    def test_generate_cuotas(self):
+        def prepare(size):
+            records = self._seed_suscripciones(size)
+            records.write({"metodo_pago": "cuotas", "numero_cuotas": 3})
+            return records
+
+        def run(records):
+            cuotas = records._generate_cuotas()
+            self.assertEqual(len(cuotas), len(records) * 3)
+
+        self._assert_scales("generate_cuotas", prepare, run, self.sizes)
+
+    def test_notifications(self):
+        Notificacion = self.env["publicidad.notificacion"]
+        body = "Suscripción Confirmada: El pago ha sido validado."
+        seeded = self.env["publicidad.suscripcion"]
+
+        def prepare(size):
+            nonlocal seeded
+            records = self._seed_suscripciones(size)
+            Notificacion._enqueue(records, body)
+            seeded |= records
+            return records
+
+        def run(records):
+            Notificacion._cron_send(batch_size=len(records))
+
+        self._assert_scales("notifications", prepare, run, self.sizes)
+        self.assertFalse(Notificacion.search_count([]))
+        notes = self.env["mail.message"].search_count(
+            [
+                ("model", "=", "publicidad.suscripcion"),
+                ("res_id", "in", seeded.ids),
+                ("body", "ilike", "El pago ha sido validado"),
+            ]
+        )
+        self.assertEqual(notes, len(seeded))
+
+    def test_technical_specs(self):
+        def run(records):
+            records._compute_technical_specs()
+
+        results = self._assert_scales(
+            "technical_specs", self._seed_suscripciones, run, self.sizes
+        )
+        # Sin N+1: mismas consultas sin importar el tamaño
+        self.assertEqual(results[0]["queries"], results[1]["queries"])
+
+    def test_list_search_read(self):
+        fields_list = [
+            "name",
+            "partner_id",
+            "product_id",
+            "centro_comercial",
+            "fecha_inicio",
+            "fecha_fin",
+            "state",
+            "estado_arte",
+        ]
+
+        def run(_records):
+            self.env["publicidad.suscripcion"].search_read([], fields_list, limit=80)
+
+        self._assert_scales(
+            "list_search_read", self._seed_suscripciones, run, self.sizes
+        )
+
+    def test_timeline(self):
+        Suscripcion = self.env["publicidad.suscripcion"]
+        date_from = fields.Date.today()
+        date_to = date_from + relativedelta(months=6)
+
+        def prepare(size):
+            records = self._seed_suscripciones(size)
+            records.write({"state": "waiting_payment"})
+            return records
+
+        def run(records):
+            page = Suscripcion.get_timeline(
+                date_from, date_to, offset=0, limit=len(records)
+            )
+            self.assertTrue(page["assets"])
+
+        self._assert_scales("timeline", prepare, run, self.sizes)
+
+
+@tagged("post_install", "-at_install", "publicidad_benchmark")
+class TestPublicidadBudgets(PublicidadBenchmarkCase):
+    """Presupuestos de tamaño fijo: no se repiten en la variante grande"""
+
+    def test_create_query_budget(self):
+        vals_list = self._prepare_suscripciones(self._seed_catalog(1000))
+        self.env.flush_all()
+        self.env.invalidate_all()
+        with self.assertQueryCount(CREATE_1000_QUERY_BUDGET):
+            records = self.env["publicidad.suscripcion"].create(vals_list)
+        self.assertEqual(len(records), 1000)
+
+    def test_availability(self):
+        Suscripcion = self.env["publicidad.suscripcion"]
+        date_from = fields.Date.today()
+        date_to = date_from + relativedelta(months=AVAILABILITY_MONTHS)
+        vals_list = self._prepare_suscripciones(self._seed_catalog(AVAILABILITY_ASSETS))
+        # Reservas de 3 meses escalonadas a lo largo de la ventana
+        for i, vals in enumerate(vals_list):
+            vals["fecha_inicio"] += relativedelta(months=3 * (i % 8))
+        records = Suscripcion.create(vals_list)
+        self._add_stock_if_installed(records.product_id)
+        records.write({"state": "confirmed"})
+
+        with self._benchmark("availability", AVAILABILITY_ASSETS) as result:
+            availability = Suscripcion.get_availability(
+                date_from, date_to, centro_comercial="viva"
+            )
+        self.assertEqual(len(availability), AVAILABILITY_ASSETS)
+        self.assertTrue(all(asset["booked"] for asset in availability))
+        self.assertLess(
+            result["time"],
+            AVAILABILITY_MAX_TIME,
+            f"get_availability: {result['time']:.3f}s para "
+            f"{AVAILABILITY_ASSETS} activos x {AVAILABILITY_MONTHS} meses",
+        )
+
+
+@tagged("post_install", "-at_install", "-standard", "publicidad_benchmark_large")
+class TestPublicidadPerformanceLarge(TestPublicidadPerformance):
+    """Mismo benchmark a 10.000 registros (opt-in: --test-tags)"""
+
+    sizes = (1000, 10000)
+
+    def test_technical_specs(self):
+        # Sobre PREFETCH_MAX la lectura se parte en bloques: solo cota de crecimiento
+        def run(records):
+            records._compute_technical_specs()
+
+        self._assert_scales(
+            "technical_specs", self._seed_suscripciones, run, self.sizes
+        )
@@ -0,0 +1,484 @@
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from odoo import Command, fields
+from odoo.exceptions import ValidationError
+from odoo.tests import new_test_user, tagged
+
+from ..models.publicidad_suscripcion import ARCHIVE_HORIZON_PARAM
+from ..perf import SAMPLE_RATE_PARAM
+from .common import PublicidadCase
+
+
+@tagged("post_install", "-at_install")
+class TestPublicidad(PublicidadCase):
+    """Comportamiento funcional de suscripciones, facturación y reportes"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.asesor = new_test_user(
+            cls.env,
+            login="asesor_publicidad",
+            groups="base.group_user,publicidad_emocion_visual.group_publicidad_asesor",
+        )
+
+    def test_create_names(self):
+        records = self._seed_suscripciones(10)
+        self.assertEqual(
+            records[0].name,
+            f"SUB / {records[0].partner_id.name} / {records[0].product_id.name} "
+            "/ Fachada",
+        )
+
+    def test_create_probe(self):
+        self.env["ir.config_parameter"].sudo().set_param(SAMPLE_RATE_PARAM, "1")
+        with self.assertLogs("odoo.addons.publicidad_emocion_visual.perf") as logs:
+            self._seed_suscripciones(3)
+        create_logs = [
+            line for line in logs.output if "publicidad.suscripcion.create " in line
+        ]
+        self.assertEqual(len(create_logs), 1)
+        self.assertIn("records=3 ", create_logs[0])
+
+    def test_price_values(self):
+        record = self._seed_suscripciones(2)[1]
+        # lst_price (1000 + 500 extras de variante) + 1000000 Viva
+        # + 200 Fachada + 300 Video
+        self.assertEqual(record.precio_mensual, 1002000.0)
+        self.assertEqual(record.valor_total, 1002000.0 * 3)
+
+    def test_tarifa_recompute(self):
+        records = self._seed_suscripciones(10)
+        precio, total = records[0].precio_mensual, records[0].valor_total
+        self.env.ref("publicidad_emocion_visual.tarifa_centro_viva").recargo = 2000000.0
+        self.env["publicidad.suscripcion"]._cron_recompute_precios()
+        self.env.invalidate_all()
+        self.assertEqual(records[0].precio_mensual, precio + 1000000.0)
+        self.assertEqual(records[0].valor_total, total + 3000000.0)
+        self.assertFalse(records.filtered("precio_pendiente"))
+
+    def test_attribute_sync(self):
+        template = self._seed_catalog(1).product_tmpl_id
+        self.assertEqual(self.attr_formato.publicidad_campo, "formato_id")
+        self.assertEqual(template.formato_id, "pantalla_led")
+        self.assertEqual(template.ubicacion_macro, "fachada")
+        self.assertEqual(template.tipo_contenido, "video")
+
+    def test_aging(self):
+        records = self._seed_suscripciones(10)
+        # Cuotas del 15/01, 15/02 y 15/03: 64, 33 y 5 días de atraso al 20/03
+        records.write(
+            {
+                "fecha_inicio": date(2031, 1, 15),
+                "metodo_pago": "cuotas",
+                "numero_cuotas": 3,
+            }
+        )
+        records._generate_cuotas()
+        aging = self.env["publicidad.cuota"].get_aging(date(2031, 3, 20))
+        cuota = sum(records.mapped("valor_cuota"))
+        self.assertAlmostEqual(sum(row["total"] for row in aging), cuota * 3)
+        for bucket, expected in (
+            ("current", 0.0),
+            ("1_30", cuota),
+            ("31_60", cuota),
+            ("61_90", cuota),
+            ("90_plus", 0.0),
+        ):
+            self.assertAlmostEqual(sum(row[bucket] for row in aging), expected)
+
+    def test_hold_conflict(self):
+        first, second = self._seed_suscripciones(2)
+        second.product_id = first.product_id
+        first.action_hold()
+        self.assertTrue(first.reserva_expira)
+        with self.assertRaises(ValidationError):
+            second.action_hold()
+        # Renovar la propia reserva no choca consigo misma
+        first.action_hold()
+        self.assertEqual(len(first.reserva_ids), 1)
+
+    def test_agenda_conflicts(self):
+        first, second, third = self._seed_suscripciones(3)
+        product = first.product_id
+        self._add_stock_if_installed(product)
+        second.write(
+            {
+                "product_id": product.id,
+                "fecha_inicio": first.fecha_inicio + relativedelta(months=4),
+            }
+        )
+        (first | second).write({"state": "confirmed"})
+        # Del mes 2 al 5: cruza con ambas reservas confirmadas
+        third.write(
+            {
+                "product_id": product.id,
+                "fecha_inicio": first.fecha_inicio + relativedelta(months=2),
+            }
+        )
+        with self.assertRaises(ValidationError) as error:
+            third.write({"state": "confirmed"})
+        message = str(error.exception)
+        self.assertIn("Bloqueo de Agenda", message)
+        self.assertIn(first.name, message)
+        self.assertIn(second.name, message)
+
+    def test_agenda_conflicts_in_batch(self):
+        first, second = self._seed_suscripciones(2)
+        self._add_stock_if_installed(first.product_id)
+        second.product_id = first.product_id
+        with self.assertRaises(ValidationError) as error:
+            (first | second).write({"state": "confirmed"})
+        self.assertIn(first.name, str(error.exception))
+
+    def test_timeline_record_rules(self):
+        own, other = self._seed_suscripciones(2)
+        own.user_id = self.asesor
+        (own | other).write({"state": "waiting_payment"})
+        date_from = fields.Date.today()
+
+        page = (
+            self.env["publicidad.suscripcion"]
+            .with_user(self.asesor)
+            .get_timeline(
+                date_from,
+                date_from + relativedelta(months=6),
+                centro_comercial="viva",
+                limit=None,
+            )
+        )
+        bookings = {asset["product_id"]: asset["bookings"] for asset in page["assets"]}
+        self.assertEqual(bookings[own.product_id.id][0]["id"], own.id)
+        self.assertEqual(bookings[own.product_id.id][0]["name"], own.name)
+        # Ocupación visible, pero sin referencia ni cliente de otro asesor
+        hidden = bookings[other.product_id.id][0]
+        self.assertFalse(hidden["id"])
+        self.assertFalse(hidden["partner"])
+        self.assertNotEqual(hidden["name"], other.name)
+        self.assertEqual(hidden["state"], "waiting_payment")
+
+    def test_campana_conflict_as_asesor(self):
+        other = self._seed_suscripciones(1)
+        self._add_stock_if_installed(other.product_id)
+        other.write({"state": "confirmed"})
+        contrato = (
+            self.env["contrato.marco"]
+            .with_user(self.asesor)
+            .create({"name": "CM-ASESOR", "partner_id": self.partners[0].id})
+        )
+        wizard = (
+            self.env["publicidad.campana.wizard"]
+            .with_user(self.asesor)
+            .create(
+                {
+                    "contrato_marco_id": contrato.id,
+                    "product_ids": [Command.set(other.product_id.ids)],
+                    "fecha_inicio": other.fecha_inicio,
+                    "duracion_meses": "3",
+                }
+            )
+        )
+        wizard.action_check()
+        self.assertTrue(wizard.has_conflicts)
+        self.assertIn(other.name, wizard.line_ids.conflicto)
+
+    def test_hold_conflict_as_asesor(self):
+        other, own = self._seed_suscripciones(2)
+        self._add_stock_if_installed(other.product_id)
+        other.write({"state": "confirmed"})
+        own.write({"product_id": other.product_id.id, "user_id": self.asesor.id})
+        with self.assertRaises(ValidationError) as error:
+            own.with_user(self.asesor).action_hold()
+        self.assertIn(other.name, str(error.exception))
+
+    def test_notification_comments(self):
+        records = self._seed_suscripciones(3)
+        inbox_user = new_test_user(
+            self.env,
+            login="seguidor_inbox",
+            groups="base.group_user",
+            notification_type="inbox",
+        )
+        email_user = new_test_user(
+            self.env,
+            login="seguidor_email",
+            groups="base.group_user",
+            notification_type="email",
+        )
+        records[:2].message_subscribe(partner_ids=inbox_user.partner_id.ids)
+        records[2].message_subscribe(partner_ids=email_user.partner_id.ids)
+        Notificacion = self.env["publicidad.notificacion"]
+        Notificacion._enqueue(
+            records,
+            "Solicitud de Aprobación",
+            message_type="comment",
+            subtype_xmlid="mail.mt_comment",
+        )
+
+        Notificacion._cron_send()
+        messages = self.env["mail.message"].search(
+            [
+                ("model", "=", "publicidad.suscripcion"),
+                ("res_id", "in", records.ids),
+                ("body", "ilike", "Solicitud de Aprobación"),
+            ]
+        )
+        self.assertEqual(sorted(messages.mapped("res_id")), sorted(records.ids))
+        # Bandeja de entrada en bloque; el seguidor por correo vía message_post
+        notifications = {
+            (
+                notif.mail_message_id.res_id,
+                notif.res_partner_id,
+                notif.notification_type,
+            )
+            for notif in messages.notification_ids
+        }
+        self.assertEqual(
+            notifications,
+            {
+                (records[0].id, inbox_user.partner_id, "inbox"),
+                (records[1].id, inbox_user.partner_id, "inbox"),
+                (records[2].id, email_user.partner_id, "email"),
+            },
+        )
+
+    def test_bulk_tracking(self):
+        Message = self.env["mail.message"]
+
+        def track(size):
+            records = self._seed_suscripciones(size)
+            self.env.flush_all()
+            self.env.cr.precommit.run()
+            records.with_context(publicidad_bulk_mode=True).write(
+                {"state": "waiting_payment"}
+            )
+            self.env.flush_all()
+            queries = self.env.cr.sql_log_count
+            # El seguimiento se registra al confirmar la transacción
+            self.env.cr.precommit.run()
+            queries = self.env.cr.sql_log_count - queries
+            messages = Message.search(
+                [
+                    ("model", "=", "publicidad.suscripcion"),
+                    ("res_id", "in", records.ids),
+                    ("tracking_value_ids.field_id.name", "=", "state"),
+                ]
+            )
+            self.assertEqual(sorted(messages.mapped("res_id")), sorted(records.ids))
+            return queries
+
+        self.assertEqual(track(10), track(50))
+
+    def test_lifecycle(self):
+        today = fields.Date.today()
+        expiring, starting = self._seed_suscripciones(2)
+        self._add_stock_if_installed((expiring | starting).product_id)
+        expiring.fecha_inicio = today - relativedelta(months=4)
+        starting.write({"fecha_inicio": today, "estado_arte": "approved"})
+        (expiring | starting).write({"state": "confirmed"})
+
+        self.env["publicidad.suscripcion"]._cron_update_lifecycle(batch_size=1)
+        self.assertEqual(expiring.state, "expired")
+        self.assertEqual(starting.state, "active")
+        self.assertTrue(
+            expiring.message_ids.filtered(lambda m: "Suscripción Vencida" in m.body)
+        )
+        self.assertTrue(
+            starting.message_ids.filtered(lambda m: "en Exhibición" in m.body)
+        )
+
+    def test_lifecycle_skips_failing_record(self):
+        today = fields.Date.today()
+        blocked, ok, holder = self._seed_suscripciones(3)
+        self._add_stock_if_installed((blocked | ok).product_id)
+        (blocked | ok).write({"fecha_inicio": today, "estado_arte": "approved"})
+        (blocked | ok).write({"state": "confirmed"})
+        # Reserva temporal vigente de otra suscripción: activar falla
+        self.env["publicidad.reserva"].create(
+            {
+                "suscripcion_id": holder.id,
+                "product_id": blocked.product_id.id,
+                "fecha_inicio": blocked.fecha_inicio,
+                "fecha_fin": blocked.fecha_fin,
+                "expires_at": fields.Datetime.now() + relativedelta(hours=1),
+            }
+        )
+
+        with self.assertLogs(
+            "odoo.addons.publicidad_emocion_visual.models.publicidad_suscripcion",
+            "ERROR",
+        ) as logs:
+            self.env["publicidad.suscripcion"]._cron_update_lifecycle()
+        self.assertIn(str(blocked.id), logs.output[0])
+        self.assertEqual(blocked.state, "confirmed")
+        self.assertEqual(ok.state, "active")
+
+    def test_invoice_paid(self):
+        records = self._seed_suscripciones(2)
+        records.write({"state": "waiting_payment"})
+        moves = records._generate_invoices(date_to=records[0].fecha_inicio)
+        self.assertEqual(len(moves), 2)
+        moves.action_post()
+        self.assertEqual(records.invoice_id, moves)
+
+        moves[0].write({"payment_state": "paid"})
+        self.assertEqual(records.mapped("state"), ["confirmed", "waiting_payment"])
+        moves[1].write({"payment_state": "paid"})
+        self.assertEqual(records.mapped("state"), ["confirmed", "confirmed"])
+
+    def test_generate_invoices_idempotent(self):
+        record = self._seed_suscripciones(1)
+        record.write(
+            {
+                "metodo_pago": "cuotas",
+                "numero_cuotas": 3,
+                "porcentaje_anticipo": 20,
+                "state": "waiting_payment",
+            }
+        )
+        record._generate_cuotas()
+        date_to = record.fecha_inicio + relativedelta(months=1)
+
+        moves = record._generate_invoices(date_to=date_to)
+        lines = moves.invoice_line_ids
+        self.assertEqual(sorted(lines.mapped("publicidad_cuota")), [0, 1, 2])
+        anticipo = lines.filtered(lambda line: line.publicidad_cuota == 0)
+        self.assertAlmostEqual(anticipo.price_unit, record.monto_anticipo)
+        self.assertEqual(
+            record.cuota_ids.filtered(lambda c: c.state == "invoiced").mapped("numero"),
+            [0, 1, 2],
+        )
+
+        # Segunda ejecución: nada nuevo que facturar
+        self.assertFalse(record._generate_invoices(date_to=date_to))
+        self.assertEqual(
+            self.env["account.move.line"].search_count(
+                [("publicidad_suscripcion_id", "=", record.id)]
+            ),
+            3,
+        )
+
+    def test_invoice_unlink(self):
+        record = self._seed_suscripciones(1)
+        record.write(
+            {"metodo_pago": "cuotas", "numero_cuotas": 3, "state": "waiting_payment"}
+        )
+        record._generate_cuotas()
+        moves = record._generate_invoices(date_to=record.fecha_inicio)
+        cuota = record.cuota_ids.filtered(lambda c: c.numero == 1)
+        self.assertEqual(cuota.state, "invoiced")
+
+        moves.unlink()
+        self.assertEqual(cuota.state, "pending")
+        self.assertFalse(cuota.invoice_id)
+        # La cuota se vuelve a facturar
+        self.assertTrue(record._generate_invoices(date_to=record.fecha_inicio))
+        self.assertEqual(cuota.state, "invoiced")
+
+    def test_ocupacion_report(self):
+        record = self._seed_suscripciones(1)
+        self._add_stock_if_installed(record.product_id)
+        # Del 16/01 al 16/04: meses parciales en los extremos
+        record.write({"fecha_inicio": date(2031, 1, 16), "state": "confirmed"})
+        Report = self.env["publicidad.ocupacion.report"]
+        Report._refresh(record.product_id.ids)
+
+        rows = Report.search([("product_id", "=", record.product_id.id)])
+        self.assertEqual(
+            [(row.month, row.booked_days, row.days_in_month) for row in rows],
+            [
+                (date(2031, 4, 1), 16, 30),
+                (date(2031, 3, 1), 31, 31),
+                (date(2031, 2, 1), 28, 28),
+                (date(2031, 1, 1), 16, 31),
+            ],
+        )
+        self.assertEqual(rows[1].occupancy, 100.0)
+        self.assertEqual(rows[1].suscripcion_count, 1)
+        self.assertEqual(rows[0].centro_comercial, "viva")
+        self.assertAlmostEqual(rows[3].revenue, record.precio_mensual * 16 / 31, 2)
+
+    def test_ocupacion_report_precommit(self):
+        record = self._seed_suscripciones(1)
+        self._add_stock_if_installed(record.product_id)
+        Report = self.env["publicidad.ocupacion.report"]
+        domain = [("product_id", "=", record.product_id.id)]
+
+        record.write({"state": "confirmed"})
+        # El refresco queda pendiente hasta el commit
+        self.assertFalse(Report.search(domain))
+        self.env.flush_all()
+        self.env.cr.precommit.run()
+        self.assertTrue(Report.search(domain))
+
+        record.write({"state": "cancel"})
+        self.env.flush_all()
+        self.env.cr.precommit.run()
+        self.assertFalse(Report.search(domain))
+
+    def test_contrato_aggregates(self):
+        contrato = self.env["contrato.marco"].create(
+            {"name": "CM-TEST", "partner_id": self.partners[0].id}
+        )
+        confirmed, active, draft = self._seed_suscripciones(3)
+        self._add_stock_if_installed((confirmed | active).product_id)
+        (confirmed | active | draft).contrato_marco_id = contrato
+        confirmed.write({"state": "confirmed", "duracion_meses": "6"})
+        active.write({"state": "active"})
+
+        self.assertEqual(
+            contrato.valor_contratado, confirmed.valor_total + active.valor_total
+        )
+        self.assertEqual(
+            contrato.saldo_restante, confirmed.saldo_restante + active.saldo_restante
+        )
+        self.assertEqual(contrato.suscripcion_activa_count, 1)
+        self.assertEqual(contrato.proxima_fecha_fin, active.fecha_fin)
+
+        active.write({"state": "cancel"})
+        self.assertEqual(contrato.valor_contratado, confirmed.valor_total)
+        self.assertEqual(contrato.suscripcion_activa_count, 0)
+        self.assertEqual(contrato.proxima_fecha_fin, confirmed.fecha_fin)
+
+    def test_repair_financial_amounts(self):
+        records = self._seed_suscripciones(3)
+        records.write(
+            {"metodo_pago": "cuotas", "numero_cuotas": 3, "porcentaje_anticipo": 20}
+        )
+        fnames = ["valor_total", "monto_anticipo", "saldo_restante", "valor_cuota"]
+        expected = records.read(fnames)
+        self.env.flush_all()
+        self.env.cr.execute(
+            """
+            UPDATE publicidad_suscripcion
+               SET valor_total = 0, monto_anticipo = 0,
+                   saldo_restante = 0, valor_cuota = 0
+             WHERE id IN %s
+            """,
+            [tuple(records.ids)],
+        )
+        self.env.invalidate_all()
+
+        self.env["publicidad.suscripcion"]._repair_financial_amounts(batch_size=2)
+        self.assertEqual(records.read(fnames), expected)
+
+    def test_archive(self):
+        today = fields.Date.today()
+        old, recent, draft = self._seed_suscripciones(3)
+        old.fecha_inicio = today - relativedelta(months=30)
+        recent.fecha_inicio = today - relativedelta(months=6)
+        draft.fecha_inicio = today - relativedelta(months=30)
+        (old | recent).write({"state": "expired"})
+        Suscripcion = self.env["publicidad.suscripcion"]
+
+        Suscripcion._cron_archive(batch_size=1)
+        self.assertFalse(old.active)
+        self.assertTrue(recent.active)
+        self.assertTrue(draft.active)
+
+        # Horizonte 0: archivo desactivado
+        old.active = True
+        self.env["ir.config_parameter"].sudo().set_param(ARCHIVE_HORIZON_PARAM, "0")
+        Suscripcion._cron_archive()
+        self.assertTrue(old.active)
@@ -0,0 +1,2 @@
+from . import publicidad_campana_wizard
+from . import publicidad_import_wizard
@@ -0,0 +1,239 @@
+from dateutil.relativedelta import relativedelta
+from odoo import Command, api, fields, models, _
+from odoo.exceptions import ValidationError
+
+
+class PublicidadCampanaWizard(models.TransientModel):
+    _name = "publicidad.campana.wizard"
+    _description = "Asistente de reserva de campaña multi-activo"
+
+    contrato_marco_id = fields.Many2one(
+        comodel_name="contrato.marco",
+        string="Contrato Marco",
+        required=True,
+    )
+    partner_id = fields.Many2one(related="contrato_marco_id.partner_id")
+    product_ids = fields.Many2many(
+        comodel_name="product.product",
+        string="Activos Publicitarios",
+        required=True,
+    )
+    fecha_inicio = fields.Date(
+        string="Fecha de inicio",
+        required=True,
+        default=fields.Date.context_today,
+    )
+    duracion_meses = fields.Selection(
+        selection=lambda self: (
+            self.env["publicidad.suscripcion"]._fields["duracion_meses"].selection
+        ),
+        string="Duración (meses)",
+        required=True,
+    )
+    fecha_fin = fields.Date(string="Fecha de fin", compute="_compute_fecha_fin")
+    tipo_contenido = fields.Selection(
+        selection=lambda self: (
+            self.env["publicidad.suscripcion"]._fields["tipo_contenido"].selection
+        ),
+        string="Tipo de Contenido",
+        required=True,
+        default="estatico",
+    )
+    centro_comercial = fields.Selection(
+        selection=lambda self: (
+            self.env["publicidad.suscripcion"]._fields["centro_comercial"].selection
+        ),
+        string="Centro Comercial",
+        help="Se usa cuando el activo no tiene centro comercial configurado",
+    )
+    ubicacion_macro = fields.Selection(
+        selection=lambda self: (
+            self.env["publicidad.suscripcion"]._fields["ubicacion_macro"].selection
+        ),
+        string="Ubicación Macro",
+        help="Se usa cuando el activo no tiene ubicación configurada",
+    )
+    line_ids = fields.One2many(
+        comodel_name="publicidad.campana.wizard.line",
+        inverse_name="wizard_id",
+        string="Reservas",
+    )
+    state = fields.Selection(
+        selection=[("draft", "Selección"), ("review", "Revisión")],
+        default="draft",
+    )
+    has_conflicts = fields.Boolean(compute="_compute_has_conflicts")
+
+    @api.depends("fecha_inicio", "duracion_meses")
+    def _compute_fecha_fin(self):
+        for wizard in self:
+            if wizard.fecha_inicio and wizard.duracion_meses:
+                wizard.fecha_fin = wizard.fecha_inicio + relativedelta(
+                    months=int(wizard.duracion_meses)
+                )
+            else:
+                wizard.fecha_fin = False
+
+    @api.depends("line_ids.conflicto")
+    def _compute_has_conflicts(self):
+        for wizard in self:
+            wizard.has_conflicts = any(wizard.line_ids.mapped("conflicto"))
+
+    def _prepare_suscripcion_vals(self):
+        """Valores de suscripción por activo seleccionado"""
+        self.ensure_one()
+        vals_list = []
+        for product in self.product_ids:
+            template = product.product_tmpl_id
+            vals_list.append(
+                {
+                    "partner_id": self.contrato_marco_id.partner_id.id,
+                    "contrato_marco_id": self.contrato_marco_id.id,
+                    "product_id": product.id,
+                    "fecha_inicio": self.fecha_inicio,
+                    "duracion_meses": self.duracion_meses,
+                    "tipo_contenido": self.tipo_contenido,
+                    "centro_comercial": template.centro_comercial
+                    or self.centro_comercial,
+                    "ubicacion_macro": template.ubicacion_macro or self.ubicacion_macro,
+                }
+            )
+        return vals_list
+
+    def action_check(self):
+        """Cotiza todos los activos y verifica la agenda en una sola consulta"""
+        self.ensure_one()
+        vals_list = self._prepare_suscripcion_vals()
+        missing = [
+            vals
+            for vals in vals_list
+            if not vals["centro_comercial"] or not vals["ubicacion_macro"]
+        ]
+        if missing:
+            raise ValidationError(
+                _(
+                    "Indique el centro comercial y la ubicación macro para los "
+                    "activos que no los tienen configurados."
+                )
+            )
+
+        # Precios con el motor de la suscripción (registros en memoria)
+        Suscripcion = self.env["publicidad.suscripcion"]
+        drafts = Suscripcion.browse()
+        for vals in vals_list:
+            drafts |= Suscripcion.new(vals)
+        drafts.mapped("valor_total")
+
+        # Las reservas en conflicto pueden ser de otro asesor: solo se
+        # muestran su referencia y fechas
+        conflicts = Suscripcion.sudo()._search_agenda_conflicts(
+            [
+                (vals["product_id"], draft.fecha_inicio, draft.fecha_fin)
+                for vals, draft in zip(vals_list, drafts)
+            ]
+        )
+        line_commands = [Command.clear()]
+        for idx, (vals, draft) in enumerate(zip(vals_list, drafts)):
+            others = conflicts.get(idx, Suscripcion)
+            line_commands.append(
+                Command.create(
+                    {
+                        "product_id": vals["product_id"],
+                        "centro_comercial": vals["centro_comercial"],
+                        "ubicacion_macro": vals["ubicacion_macro"],
+                        "precio_mensual": draft.precio_mensual,
+                        "valor_total": draft.valor_total,
+                        "conflicto": ", ".join(
+                            _("%(ref)s (%(start)s - %(end)s)")
+                            % {
+                                "ref": other.name,
+                                "start": other.fecha_inicio.strftime("%d/%m/%Y"),
+                                "end": other.fecha_fin.strftime("%d/%m/%Y"),
+                            }
+                            for other in others
+                        ),
+                    }
+                )
+            )
+        self.write({"line_ids": line_commands, "state": "review"})
+        return self._reopen()
+
+    def action_back(self):
+        self.write({"line_ids": [Command.clear()], "state": "draft"})
+        return self._reopen()
+
+    def action_create(self):
+        """Crea todas las suscripciones de la campaña en un solo create()"""
+        self.ensure_one()
+        self.action_check()
+        if self.has_conflicts:
+            return self._reopen()
+        suscripciones = self.env["publicidad.suscripcion"].create(
+            self._prepare_suscripcion_vals()
+        )
+        return {
+            "type": "ir.actions.act_window",
+            "name": _("Suscripciones de la Campaña"),
+            "res_model": "publicidad.suscripcion",
+            "view_mode": "list,form",
+            "domain": [("id", "in", suscripciones.ids)],
+        }
+
+    def _reopen(self):
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }
+
+
+class PublicidadCampanaWizardLine(models.TransientModel):
+    _name = "publicidad.campana.wizard.line"
+    _description = "Reserva propuesta del asistente de campaña"
+
+    wizard_id = fields.Many2one(
+        comodel_name="publicidad.campana.wizard",
+        required=True,
+        ondelete="cascade",
+    )
+    product_id = fields.Many2one(
+        comodel_name="product.product",
+        string="Activo Publicitario",
+        readonly=True,
+    )
+    centro_comercial = fields.Selection(
+        selection=lambda self: (
+            self.env["publicidad.suscripcion"]._fields["centro_comercial"].selection
+        ),
+        string="Centro Comercial",
+        readonly=True,
+    )
+    ubicacion_macro = fields.Selection(
+        selection=lambda self: (
+            self.env["publicidad.suscripcion"]._fields["ubicacion_macro"].selection
+        ),
+        string="Ubicación Macro",
+        readonly=True,
+    )
+    currency_id = fields.Many2one(
+        "res.currency",
+        default=lambda self: self.env.company.currency_id,
+        readonly=True,
+    )
+    precio_mensual = fields.Monetary(
+        string="Precio Mensual",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    valor_total = fields.Monetary(
+        string="Valor Total",
+        currency_field="currency_id",
+        readonly=True,
+    )
+    conflicto = fields.Char(
+        string="Conflicto de Agenda",
+        readonly=True,
+        help="Suscripciones confirmadas o activas que ocupan el activo",
+    )
@@ -0,0 +1,462 @@
+import base64
+import csv
+import io
+import json
+import threading
+from collections import defaultdict
+from datetime import date, datetime
+
+import psycopg2
+from dateutil.relativedelta import relativedelta
+from odoo import Command, api, fields, models, _
+from odoo.exceptions import UserError
+
+from ..models.publicidad_suscripcion import AGENDA_STATES
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Encabezado del archivo → campo de la suscripción
+IMPORT_COLUMNS = {
+    "referencia": "name",
+    "cliente": "partner_id",
+    "activo": "product_id",
+    "contrato": "contrato_marco_id",
+    "fecha_inicio": "fecha_inicio",
+    "duracion_meses": "duracion_meses",
+    "tipo_contenido": "tipo_contenido",
+    "centro_comercial": "centro_comercial",
+    "ubicacion_macro": "ubicacion_macro",
+    "metodo_pago": "metodo_pago",
+    "numero_cuotas": "numero_cuotas",
+    "porcentaje_anticipo": "porcentaje_anticipo",
+    "estado": "state",
+}
+REQUIRED_COLUMNS = (
+    "cliente",
+    "activo",
+    "fecha_inicio",
+    "duracion_meses",
+    "centro_comercial",
+    "ubicacion_macro",
+)
+SELECTION_COLUMNS = (
+    "duracion_meses",
+    "tipo_contenido",
+    "centro_comercial",
+    "ubicacion_macro",
+    "metodo_pago",
+    "estado",
+)
+
+# Filas por create() y por commit
+IMPORT_CHUNK_SIZE = 500
+
+
+class PublicidadImportWizard(models.TransientModel):
+    _name = "publicidad.import.wizard"
+    _description = "Importación masiva de suscripciones heredadas"
+
+    data_file = fields.Binary(string="Archivo", required=True, attachment=False)
+    filename = fields.Char(string="Nombre del archivo")
+    chunk_size = fields.Integer(
+        string="Filas por lote",
+        default=IMPORT_CHUNK_SIZE,
+        required=True,
+    )
+    resume_row = fields.Integer(
+        string="Última fila procesada",
+        default=0,
+        help="Las filas hasta esta posición se omiten; permite retomar una "
+        "importación interrumpida",
+    )
+    state = fields.Selection(
+        selection=[("draft", "Pendiente"), ("done", "Terminada")],
+        default="draft",
+    )
+    imported_count = fields.Integer(string="Suscripciones importadas", readonly=True)
+    error_ids = fields.One2many(
+        comodel_name="publicidad.import.wizard.error",
+        inverse_name="wizard_id",
+        string="Errores",
+        readonly=True,
+    )
+    error_count = fields.Integer(compute="_compute_error_count")
+    error_file = fields.Binary(string="Reporte de errores", readonly=True)
+    error_filename = fields.Char(readonly=True)
+
+    @api.depends("error_ids")
+    def _compute_error_count(self):
+        for wizard in self:
+            wizard.error_count = len(wizard.error_ids)
+
+    # --- LECTURA DEL ARCHIVO ---
+
+    def _read_rows(self):
+        """Retorna (encabezados, iterador de (número de fila, valores)).
+
+        El archivo se recorre en streaming: CSV con ``csv.reader`` y XLSX
+        con openpyxl en modo de solo lectura.
+        """
+        self.ensure_one()
+        raw = base64.b64decode(self.data_file)
+        if (self.filename or "").lower().endswith(".xlsx"):
+            return self._read_xlsx(raw)
+        return self._read_csv(raw)
+
+    def _read_csv(self, raw):
+        stream = io.TextIOWrapper(io.BytesIO(raw), encoding="utf-8-sig", newline="")
+        first_line = stream.readline()
+        stream.seek(0)
+        delimiter = ";" if first_line.count(";") > first_line.count(",") else ","
+        reader = csv.reader(stream, delimiter=delimiter)
+        headers = [self._normalize_header(value) for value in next(reader, [])]
+
+        def rows():
+            for row_number, values in enumerate(reader, start=2):
+                if any(values):
+                    yield row_number, dict(zip(headers, values))
+
+        return headers, rows()
+
+    def _read_xlsx(self, raw):
+        if openpyxl is None:
+            raise UserError(
+                _("Se requiere la librería openpyxl para importar archivos XLSX.")
+            )
+        workbook = openpyxl.load_workbook(
+            io.BytesIO(raw), read_only=True, data_only=True
+        )
+        sheet_rows = workbook.active.iter_rows(values_only=True)
+        headers = [self._normalize_header(value) for value in next(sheet_rows, ())]
+
+        def rows():
+            try:
+                for row_number, values in enumerate(sheet_rows, start=2):
+                    if any(value not in (None, "") for value in values):
+                        yield row_number, dict(zip(headers, values))
+            finally:
+                workbook.close()
+
+        return headers, rows()
+
+    @api.model
+    def _normalize_header(self, value):
+        return str(value or "").strip().lower().replace(" ", "_")
+
+    def _pending_rows(self):
+        """Filas posteriores a la última procesada"""
+        headers, rows = self._read_rows()
+        missing = [column for column in REQUIRED_COLUMNS if column not in headers]
+        if missing:
+            raise UserError(
+                _("Faltan columnas obligatorias en el archivo: %s") % ", ".join(missing)
+            )
+        return headers, (
+            (row_number, values)
+            for row_number, values in rows
+            if row_number > self.resume_row
+        )
+
+    # --- MAPAS DE REFERENCIAS ---
+
+    def _build_lookup_maps(self):
+        """Resuelve clientes, activos y contratos con una consulta por modelo"""
+        keys = defaultdict(set)
+        for _row_number, values in self._pending_rows()[1]:
+            for column in ("cliente", "activo", "contrato"):
+                key = self._cell(values, column)
+                if key:
+                    keys[column].add(key)
+
+        maps = {"cliente": {}, "activo": {}, "contrato": {}}
+        if keys["cliente"]:
+            partners = self.env["res.partner"].search_fetch(
+                [
+                    "|",
+                    ("ref", "in", list(keys["cliente"])),
+                    ("name", "in", list(keys["cliente"])),
+                ],
+                ["name", "ref"],
+                order="id",
+            )
+            for partner in partners:
+                for key in (partner.ref, partner.name):
+                    if key in keys["cliente"]:
+                        maps["cliente"].setdefault(key, partner.id)
+        if keys["activo"]:
+            products = self.env["product.product"].search_fetch(
+                [
+                    "|",
+                    ("default_code", "in", list(keys["activo"])),
+                    ("name", "in", list(keys["activo"])),
+                ],
+                ["default_code", "name"],
+                order="id",
+            )
+            for product in products:
+                for key in (product.default_code, product.name):
+                    if key in keys["activo"]:
+                        maps["activo"].setdefault(key, product.id)
+        if keys["contrato"]:
+            contratos = self.env["contrato.marco"].search_fetch(
+                [("name", "in", list(keys["contrato"]))], ["name"], order="id"
+            )
+            for contrato in contratos:
+                maps["contrato"].setdefault(contrato.name, contrato.id)
+
+        Suscripcion = self.env["publicidad.suscripcion"]
+        for column in SELECTION_COLUMNS:
+            field = Suscripcion._fields[IMPORT_COLUMNS[column]]
+            options = {}
+            for key, label in field._description_selection(self.env):
+                options[key.lower()] = key
+                options[str(label).lower()] = key
+            maps[column] = options
+        return maps
+
+    # --- CONVERSIÓN DE FILAS ---
+
+    @api.model
+    def _cell(self, values, column):
+        value = values.get(column)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        if value is None or isinstance(value, (date, datetime)):
+            return value
+        return str(value).strip()
+
+    @api.model
+    def _parse_date(self, value):
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        for fmt in ("%Y-%m-%d", "%d/%m/%Y"):
+            try:
+                return datetime.strptime(value, fmt).date()
+            except ValueError:
+                continue
+        raise ValueError(_("Fecha de inicio no válida: %s") % value)
+
+    def _prepare_vals(self, values, maps):
+        """Valores de create() para una fila; ValueError si no es válida"""
+        vals = {}
+        for column in ("cliente", "activo", "contrato"):
+            key = self._cell(values, column)
+            if not key:
+                continue
+            if key not in maps[column]:
+                raise ValueError(
+                    _("%(column)s no encontrado: %(key)s")
+                    % {"column": column.capitalize(), "key": key}
+                )
+            vals[IMPORT_COLUMNS[column]] = maps[column][key]
+        for column in SELECTION_COLUMNS:
+            value = self._cell(values, column)
+            if not value:
+                continue
+            if str(value).lower() not in maps[column]:
+                raise ValueError(
+                    _("Valor no válido para %(column)s: %(value)s")
+                    % {"column": column, "value": value}
+                )
+            vals[IMPORT_COLUMNS[column]] = maps[column][str(value).lower()]
+        for column in REQUIRED_COLUMNS:
+            if not self._cell(values, column):
+                raise ValueError(_("La columna %s es obligatoria.") % column)
+
+        vals["fecha_inicio"] = self._parse_date(self._cell(values, "fecha_inicio"))
+        if self._cell(values, "referencia"):
+            vals["name"] = self._cell(values, "referencia")
+        try:
+            if self._cell(values, "numero_cuotas"):
+                vals["numero_cuotas"] = int(self._cell(values, "numero_cuotas"))
+            if self._cell(values, "porcentaje_anticipo"):
+                vals["porcentaje_anticipo"] = float(
+                    self._cell(values, "porcentaje_anticipo")
+                )
+        except ValueError:
+            raise ValueError(_("Cuotas o anticipo con formato numérico no válido."))
+        return vals
+
+    # --- VALIDACIÓN PREVIA ---
+
+    def _validate_agenda(self, maps):
+        """Valida el archivo completo antes de escribir en la base de datos.
+
+        Los cruces entre filas se detectan en memoria ordenando los intervalos
+        por activo; los cruces con la agenda existente se consultan por lotes.
+        Retorna {número de fila: mensaje de error}.
+        """
+        errors = {}
+        slots = defaultdict(list)
+        for row_number, values in self._pending_rows()[1]:
+            try:
+                vals = self._prepare_vals(values, maps)
+            except ValueError as error:
+                errors[row_number] = str(error)
+                continue
+            if vals.get("state") in AGENDA_STATES:
+                fecha_fin = vals["fecha_inicio"] + relativedelta(
+                    months=int(vals["duracion_meses"])
+                )
+                slots[vals["product_id"]].append(
+                    (vals["fecha_inicio"], fecha_fin, row_number)
+                )
+
+        # Cruces dentro del archivo
+        flat_slots = []
+        for product_id, intervals in slots.items():
+            intervals.sort()
+            last_end, last_row = None, None
+            for start, end, row_number in intervals:
+                if last_end and start <= last_end:
+                    errors[row_number] = (
+                        _("Bloqueo de Agenda: cruce con la fila %s del archivo.")
+                        % last_row
+                    )
+                    continue
+                last_end, last_row = end, row_number
+                flat_slots.append((product_id, start, end, row_number))
+
+        # Cruces con la agenda existente
+        Suscripcion = self.env["publicidad.suscripcion"]
+        for offset in range(0, len(flat_slots), self.chunk_size):
+            chunk = flat_slots[offset : offset + self.chunk_size]
+            conflicts = Suscripcion._search_agenda_conflicts(
+                [(product_id, start, end) for product_id, start, end, _row in chunk]
+            )
+            for idx, others in conflicts.items():
+                errors[chunk[idx][3]] = _(
+                    "Bloqueo de Agenda: cruce con %s."
+                ) % ", ".join(others.mapped("name"))
+        return errors
+
+    # --- IMPORTACIÓN ---
+
+    def action_import(self):
+        """Importa el archivo en lotes con commit intermedio.
+
+        Cada lote se inserta con un solo ``create()``; si falla, se reintenta
+        fila por fila para aislar los registros con error. Tras cada commit se
+        guarda la última fila procesada, de modo que una importación
+        interrumpida se retoma desde ese punto.
+        """
+        self.ensure_one()
+        if self.chunk_size < 1:
+            raise UserError(_("Las filas por lote deben ser mayores a cero."))
+        auto_commit = not getattr(threading.current_thread(), "testing", False)
+        self.error_ids.filtered(lambda e: e.row_number > self.resume_row).unlink()
+
+        maps = self._build_lookup_maps()
+        errors = self._validate_agenda(maps)
+        # import_file activa el seguimiento masivo de publicidad.suscripcion
+        Suscripcion = self.env["publicidad.suscripcion"].with_context(
+            import_file=True,
+            mail_create_nosubscribe=True,
+        )
+
+        chunk = []
+        for row_number, values in self._pending_rows()[1]:
+            chunk.append((row_number, values))
+            if len(chunk) >= self.chunk_size:
+                self._import_chunk(Suscripcion, chunk, maps, errors)
+                chunk = []
+                if auto_commit:
+                    self.env.cr.commit()
+        if chunk:
+            self._import_chunk(Suscripcion, chunk, maps, errors)
+        self.state = "done"
+        self._generate_error_report()
+        return self._reopen()
+
+    def _import_chunk(self, Suscripcion, chunk, maps, errors):
+        error_vals = []
+        valid = []
+        for row_number, values in chunk:
+            if row_number in errors:
+                error_vals.append(self._error_vals(row_number, values, errors))
+            else:
+                valid.append((row_number, values, self._prepare_vals(values, maps)))
+
+        created = 0
+        if valid:
+            try:
+                with self.env.cr.savepoint():
+                    Suscripcion.create([vals for _row, _values, vals in valid])
+                created = len(valid)
+            except (UserError, psycopg2.Error):
+                for row_number, values, vals in valid:
+                    try:
+                        with self.env.cr.savepoint():
+                            Suscripcion.create(vals)
+                        created += 1
+                    except (UserError, psycopg2.Error) as error:
+                        errors[row_number] = str(error)
+                        error_vals.append(self._error_vals(row_number, values, errors))
+
+        self.write(
+            {
+                "resume_row": chunk[-1][0],
+                "imported_count": self.imported_count + created,
+                "error_ids": [Command.create(vals) for vals in error_vals],
+            }
+        )
+
+    @api.model
+    def _error_vals(self, row_number, values, errors):
+        return {
+            "row_number": row_number,
+            "message": errors[row_number],
+            "data": json.dumps(values, default=str),
+        }
+
+    def _generate_error_report(self):
+        """Reporte CSV con las filas rechazadas y sus columnas originales"""
+        if not self.error_ids:
+            self.write({"error_file": False, "error_filename": False})
+            return
+        headers = self._read_rows()[0]
+        output = io.StringIO()
+        writer = csv.writer(output)
+        writer.writerow(["fila", "error"] + headers)
+        for error in self.error_ids.sorted("row_number"):
+            data = json.loads(error.data or "{}")
+            writer.writerow(
+                [error.row_number, error.message]
+                + [data.get(header, "") for header in headers]
+            )
+        self.write(
+            {
+                "error_file": base64.b64encode(output.getvalue().encode()),
+                "error_filename": "errores_%s.csv"
+                % (self.filename or "importacion").rsplit(".", 1)[0],
+            }
+        )
+
+    def _reopen(self):
+        return {
+            "type": "ir.actions.act_window",
+            "res_model": self._name,
+            "res_id": self.id,
+            "view_mode": "form",
+            "target": "new",
+        }
+
+
+class PublicidadImportWizardError(models.TransientModel):
+    _name = "publicidad.import.wizard.error"
+    _description = "Fila rechazada en la importación de suscripciones"
+    _order = "row_number"
+
+    wizard_id = fields.Many2one(
+        comodel_name="publicidad.import.wizard",
+        required=True,
+        ondelete="cascade",
+    )
+    row_number = fields.Integer(string="Fila", readonly=True)
+    message = fields.Char(string="Error", readonly=True)
+    data = fields.Text(readonly=True)